@@ -0,0 +1,181 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+MODEL_PATH = os.path.join('models', 'model.h5')
+AFFINE_PATH = os.path.join('models', 'affine.npz')
+DATA_PATH = os.path.join('Data', 'preprocessed.csv')
+VERIFY_ROWS = 10000
+TOLERANCE = 1e-5
+
+
+def decode(names):
+    return [n.decode() if isinstance(n, bytes) else n for n in names]
+
+
+def check_activations(activations):
+    for i, (name, activation) in enumerate(activations):
+        if activation != ('softmax' if i == len(activations) - 1 else 'linear'):
+            raise ValueError('Cannot Fold Layer {0} With Activation :: {1}'.format(name, activation))
+
+
+def config_activations(config):
+    activations = []
+    for layer in config['config']['layers']:
+        if 'layers' in layer['config']:
+            activations.extend(config_activations(layer))
+        elif layer['class_name'] != 'InputLayer':
+            activations.append((layer['config']['name'], layer['config'].get('activation')))
+    return activations
+
+
+def read_dense_weights(model_path=MODEL_PATH):
+    import h5py
+
+    layers = []
+    with h5py.File(model_path, 'r') as f:
+        if 'model_config' not in f.attrs:
+            raise ValueError('Cannot Fold Model Without model_config :: {0}'.format(model_path))
+        config = f.attrs['model_config']
+        activations = config_activations(json.loads(config.decode() if isinstance(config, bytes) else config))
+        root = f['model_weights'] if 'model_weights' in f else f
+        for name in decode(root.attrs['layer_names']):
+            group = root[name]
+            weights = [np.asarray(group[w], dtype=np.float64) for w in decode(group.attrs['weight_names'])]
+            layers.extend(zip(weights[0::2], weights[1::2]))
+    if len(activations) != len(layers):
+        raise ValueError('Layer Count Mismatch :: Config {0} | Weights {1}'.format(len(activations), len(layers)))
+    check_activations(activations)
+    return layers
+
+
+def leaf_layers(model):
+    for layer in model.layers:
+        if hasattr(layer, 'layers'):
+            yield from leaf_layers(layer)
+        else:
+            yield layer
+
+
+def model_config(model):
+    layers = []
+    for layer in model.layers:
+        if hasattr(layer, 'layers'):
+            layers.append(model_config(layer))
+        else:
+            layers.append({'class_name': type(layer).__name__,
+                           'config': {'name': layer.name, 'activation': getattr(layer.activation, '__name__', None)}})
+    return {'class_name': type(model).__name__, 'config': {'name': model.name, 'layers': layers}}
+
+
+def write_model_config(model, model_path=MODEL_PATH):
+    import h5py
+
+    with h5py.File(model_path, 'a') as f:
+        if 'model_config' not in f.attrs:
+            f.attrs['model_config'] = json.dumps(model_config(model))
+
+
+def keras_dense_weights(model):
+    leaves = list(leaf_layers(model))
+    check_activations([(layer.name, getattr(layer.activation, '__name__', None)) for layer in leaves])
+    return [tuple(w.astype(np.float64) for w in layer.get_weights()) for layer in leaves]
+
+
+def collapse(layers):
+    weight, bias = layers[0]
+    for kernel, b in layers[1:]:
+        weight = weight @ kernel
+        bias = bias @ kernel + b
+    return weight, bias
+
+
+def softmax(logits):
+    logits = logits - logits.max(axis=1, keepdims=True)
+    e = np.exp(logits)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+class AffinePredictor:
+    def __init__(self, weight, bias, dtype=np.float64):
+        self.weight = np.ascontiguousarray(weight, dtype=dtype)
+        self.bias = np.asarray(bias, dtype=dtype)
+
+    @classmethod
+    def from_layers(cls, layers, dtype=np.float64):
+        return cls(*collapse(layers), dtype=dtype)
+
+    @classmethod
+    def load(cls, path=AFFINE_PATH, dtype=np.float64):
+        data = np.load(path)
+        return cls(data['weight'], data['bias'], dtype=dtype)
+
+    def save(self, path=AFFINE_PATH):
+        np.savez(path, weight=self.weight, bias=self.bias)
+        print('[INFO] Saving Affine Model :: {0}'.format(path))
+
+    def logits(self, x):
+        return np.asarray(x, dtype=self.weight.dtype) @ self.weight + self.bias
+
+    def predict(self, x):
+        return softmax(self.logits(np.atleast_2d(x)))
+
+    __call__ = predict
+
+
+def export(model_path=MODEL_PATH, affine_path=AFFINE_PATH):
+    print('[INFO] Folding Dense Layers :: {0}'.format(model_path))
+    layers = read_dense_weights(model_path)
+    predictor = AffinePredictor.from_layers(layers)
+    print('[INFO] Layers Folded :: {0} | Weight Shape :: {1}'.format(len(layers), predictor.weight.shape))
+    predictor.save(affine_path)
+    return predictor
+
+
+def load_affine_predictor(affine_path=AFFINE_PATH):
+    print('[INFO] Loading Affine Model :: {0}'.format(affine_path))
+    return AffinePredictor.load(affine_path).predict
+
+
+def verify(predictor, model_path=MODEL_PATH, data_path=DATA_PATH, rows=VERIFY_ROWS, tolerance=TOLERANCE):
+    from data_cache import read_csv_cached
+    from model import buildDSSAE
+    from reset_random import reset_random
+
+    reset_random()
+    model = buildDSSAE()
+    model.load_weights(model_path)
+    keras_dense_weights(model)
+    x = read_csv_cached(data_path).iloc[:rows, :-1].to_numpy(dtype=np.float32)
+
+    t1 = time.perf_counter()
+    keras_prob = model.predict(x)
+    t2 = time.perf_counter()
+    affine_prob = predictor.predict(x)
+    t3 = time.perf_counter()
+    report = {
+        'rows': len(x),
+        'max_abs_diff': float(np.max(np.abs(keras_prob - affine_prob))),
+        'argmax_agreement': float(np.mean(np.argmax(keras_prob, axis=1) == np.argmax(affine_prob, axis=1))),
+        'keras_secs': round(t2 - t1, 6),
+        'affine_secs': round(t3 - t2, 6),
+    }
+    report['ok'] = report['max_abs_diff'] <= tolerance
+    print('[INFO] Affine Parity :: {0}'.format(json.dumps(report)))
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--out', default=AFFINE_PATH)
+    parser.add_argument('--verify', action='store_true')
+    parser.add_argument('--rows', type=int, default=VERIFY_ROWS)
+    args = parser.parse_args()
+
+    p_ = export(args.model, args.out)
+    if args.verify and not verify(p_, args.model, rows=args.rows)['ok']:
+        raise SystemExit(1)
@@ -0,0 +1,124 @@
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+N_FEATURES = 84
+DATA_PATH = os.path.join('Data', 'preprocessed.csv')
+
+
+def synthetic_frame(rows, seed=1):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'Subject_ID': rng.integers(1, 200, rows),
+        'Subject_Gender': rng.integers(1, 3, rows),
+        'Subject_Age': rng.integers(18, 40, rows),
+        'Subject_FOI': rng.integers(1, 6, rows),
+        'Video_ID': rng.integers(1, 100, rows),
+        'Video_Title': rng.integers(1, 100, rows),
+        'Video_Instructor': rng.integers(1, 10, rows),
+    })
+    eeg = pd.DataFrame(rng.normal(size=(rows, N_FEATURES)), columns=['f{0}'.format(i) for i in range(N_FEATURES)])
+    df = pd.concat([df, eeg], axis=1)
+    df['Understand'] = rng.integers(0, 2, rows)
+    return df
+
+
+def write_dataset(df, data_dir, compact):
+    from data_cache import write_cache
+    from data_handler import compact_dtypes
+
+    os.makedirs(os.path.join(data_dir, 'Data'), exist_ok=True)
+    csv_path = os.path.join(data_dir, DATA_PATH)
+    df.iloc[:0].to_csv(csv_path, index=False)
+    write_cache(compact_dtypes(df.copy()) if compact else df, csv_path)
+
+
+def legacy_path(dp):
+    from data_cache import read_csv_cached
+    from sklearn.model_selection import train_test_split
+
+    df = read_csv_cached(dp)
+    x, y = df.values[:, :-1], df.values[:, -1]
+    train_x, test_x, train_y, test_y = train_test_split(x, y, test_size=0.3, shuffle=True, random_state=1)
+    one_hot = np.eye(2, dtype=np.float32)
+    return [x, y, train_x, test_x, one_hot[y.astype(int)], one_hot[test_y.astype(int)]]
+
+
+def compact_path(dp):
+    from train import get_data, split_data
+
+    x, y = get_data(dp)
+    train_x, test_x, train_y, test_y = split_data(x, y)
+    return [x, y, train_x, test_x, y, test_y]
+
+
+def current_rss():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def measure(variant, data_dir):
+    os.chdir(data_dir)
+    fn = {'legacy': legacy_path, 'compact': compact_path}[variant]
+    for module in ['data_cache', 'sklearn.model_selection', 'train']:
+        importlib.import_module(module)
+
+    base_rss = current_rss()
+    tracemalloc.start()
+    arrays = fn(DATA_PATH)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss = current_rss()
+    return {
+        'x_dtype': str(arrays[0].dtype),
+        'y_dtype': str(arrays[1].dtype),
+        'held_mb': round(sum(a.nbytes for a in arrays) / 2 ** 20, 2),
+        'traced_peak_mb': round(peak / 2 ** 20, 2),
+        'rss_delta_mb': round((rss - base_rss) / 2 ** 20, 2),
+    }
+
+
+def run(rows):
+    results = {'rows': rows}
+    with tempfile.TemporaryDirectory() as tmp:
+        df = synthetic_frame(rows)
+        for variant, compact in [('legacy', False), ('compact', True)]:
+            data_dir = os.path.join(tmp, variant)
+            write_dataset(df, data_dir, compact)
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), '--measure', variant, data_dir],
+                                 cwd=ROOT, capture_output=True, text=True, check=True)
+            results[variant] = json.loads(out.stdout.strip().splitlines()[-1])
+    for k in ['held_mb', 'traced_peak_mb', 'rss_delta_mb']:
+        results['{0}_ratio'.format(k)] = round(results['legacy'][k] / max(results['compact'][k], 1e-9), 2)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=500000)
+    parser.add_argument('--out')
+    parser.add_argument('--measure', nargs=2, metavar=('VARIANT', 'DATA_DIR'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(*args.measure)))
+        sys.exit(0)
+    res = run(args.rows)
+    print(json.dumps(res, indent=4))
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(res, f, indent=4)
@@ -0,0 +1,87 @@
+import argparse
+import inspect
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from performance_evaluator import metrics  # noqa: E402
+
+CLASSES = ['Not-Understand', 'Understand']
+
+
+def loop_confusion_matrix(actual, predicted, n_classes):
+    cm = np.zeros((n_classes, n_classes), dtype=int)
+    for i in range(len(actual)):
+        cm[actual[i]][predicted[i]] += 1
+    return cm
+
+
+def getargspec_dispatch(cm, kwargs, required_metrics):
+    tp, fn, fp, tn = metrics.get_tp_fn_fp_tn(cm)
+    kwargs = dict(kwargs, cm=cm, tp=tp, fn=fn, fp=fp, tn=tn)
+    for m in required_metrics:
+        fn_ = getattr(metrics, m)
+        keys = [k for k in inspect.getfullargspec(fn_).args if k in kwargs]
+        fn_(**{k: kwargs[k] for k in keys})
+
+
+def precomputed_dispatch(cm, kwargs, required_metrics):
+    tp, fn, fp, tn = metrics.get_tp_fn_fp_tn(cm)
+    kwargs = dict(kwargs, cm=cm, tp=tp, fn=fn, fp=fp, tn=tn)
+    for m in required_metrics:
+        fn_, args = metrics.DISPATCH[m]
+        fn_(*[kwargs[a] for a in args])
+
+
+def timeit(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t1 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t1)
+    return best
+
+
+def make_data(n, n_classes=len(CLASSES), seed=1):
+    rng = np.random.default_rng(seed)
+    actual = rng.integers(0, n_classes, n)
+    probability = rng.dirichlet(np.ones(n_classes), n)
+    predicted = np.argmax(probability, axis=1)
+    return actual, predicted, probability
+
+
+def run(n, repeat):
+    actual, predicted, probability = make_data(n)
+    n_classes = len(CLASSES)
+    assert np.array_equal(loop_confusion_matrix(actual, predicted, n_classes),
+                          metrics.confusion_matrix(actual, predicted, n_classes))
+    cm = metrics.confusion_matrix(actual, predicted, n_classes)
+    no_auc = [m for m in metrics.AVAILABLE_METRICS if m not in ['pr_auc_score', 'roc_auc_score']]
+    no_auc_metrics = {m: metrics.AVAILABLE_METRICS[m] for m in no_auc}
+    kwargs = {'actual': actual, 'predicted': predicted, 'probability': probability}
+
+    results = {
+        'rows': n,
+        'confusion_matrix_loop': timeit(lambda: loop_confusion_matrix(actual, predicted, n_classes), repeat),
+        'confusion_matrix_bincount': timeit(lambda: metrics.confusion_matrix(actual, predicted, n_classes), repeat),
+        'metrics_getargspec': timeit(lambda: getargspec_dispatch(cm, kwargs, no_auc), repeat),
+        'metrics_dispatch': timeit(lambda: precomputed_dispatch(cm, kwargs, no_auc), repeat),
+        'evaluate': timeit(lambda: metrics.evaluate(actual, predicted, probability, CLASSES, no_auc_metrics),
+                           repeat),
+    }
+    results['confusion_matrix_speedup'] = results['confusion_matrix_loop'] / results['confusion_matrix_bincount']
+    results['metrics_speedup'] = results['metrics_getargspec'] / results['metrics_dispatch']
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    print(json.dumps([run(n, args.repeat) for n in args.rows], indent=4))
@@ -0,0 +1,236 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synth_data import generate  # noqa: E402
+
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+HIDDEN_UNITS = [128, 64, 2, 64, 128, 2]
+INFER_BATCH = 1024
+LATENCY_SAMPLES = 1000
+TOLERANCE = 0.25
+
+
+def timeit(fn, repeat=1):
+    best, out = float('inf'), None
+    for _ in range(repeat):
+        t1 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t1)
+    return best, out
+
+
+def entry(seconds, rows, **extra):
+    return dict({'seconds': round(seconds, 6), 'rows': rows, 'rows_per_sec': round(rows / max(seconds, 1e-9), 1)},
+                **extra)
+
+
+def bench_data(results, rows, repeat):
+    from data_handler import load_data, merge_data, preprocess_data
+
+    seconds, raw = timeit(load_data, repeat)
+    results['load_data'] = entry(seconds, rows)
+    seconds, merged = timeit(lambda: merge_data(*raw), repeat)
+    results['merge_data'] = entry(seconds, rows)
+    seconds, df = timeit(lambda: preprocess_data(merged.copy()), repeat)
+    results['preprocess_data'] = entry(seconds, rows)
+    return df
+
+
+def bench_evaluate(results, y, prob, repeat):
+    from performance_evaluator.metrics import evaluate
+    from utils import CLASSES
+
+    seconds, _ = timeit(lambda: evaluate(y, np.argmax(prob, axis=1), prob, CLASSES), repeat)
+    results['evaluate'] = entry(seconds, len(y))
+
+
+def bench_plot(results, chart, y, prob, repeat, out_dir):
+    from performance_evaluator.curves import CurveCache
+    from utils import render_task
+
+    pred = np.argmax(prob, axis=1)
+    seconds, _ = timeit(lambda: render_task(chart, y, pred, prob, out_dir, CurveCache(y, prob)), repeat)
+    results['plot_{0}'.format(chart.lower())] = entry(seconds, len(y))
+
+
+def bench_train_epoch(results, x, y, batch_size):
+    from model import buildDSSAE
+    from reset_random import reset_random
+
+    reset_random()
+    model = buildDSSAE(sparse_labels=True)
+    seconds, _ = timeit(lambda: model.fit(x, y, epochs=1, batch_size=batch_size, verbose=0))
+    results['train_epoch'] = entry(seconds, len(x), batch_size=batch_size)
+    return model
+
+
+def latency(predict, x, samples=LATENCY_SAMPLES):
+    rows = x[:samples]
+    t1 = time.perf_counter()
+    for row in rows:
+        predict(row[None])
+    return (time.perf_counter() - t1) / max(len(rows), 1)
+
+
+def bench_inference(results, name, predict, x, repeat, batch_size=INFER_BATCH):
+    def run():
+        for i in range(0, len(x), batch_size):
+            predict(x[i:i + batch_size])
+
+    seconds, _ = timeit(run, repeat)
+    results[name] = entry(seconds, len(x), batch_size=batch_size,
+                          latency_us=round(latency(predict, x) * 1e6, 3))
+
+
+def affine_layers(model, n_features, seed=1):
+    if model is not None:
+        from affine import keras_dense_weights
+        return keras_dense_weights(model)
+    rng = np.random.default_rng(seed)
+    dims = [n_features, *HIDDEN_UNITS]
+    return [(rng.normal(size=(a, b)) / np.sqrt(a), np.zeros(b)) for a, b in zip(dims[:-1], dims[1:])]
+
+
+def bench_affine(results, model, x, repeat, seed):
+    from affine import AffinePredictor
+
+    predictor = AffinePredictor.from_layers(affine_layers(model, x.shape[1], seed), dtype=np.float32)
+    bench_inference(results, 'inference_affine', predictor.predict, x, repeat)
+
+
+def bench_keras(results, model, x, repeat):
+    bench_inference(results, 'inference_keras', model.predict, x, repeat)
+
+
+def synth_data(rows, seed, data_dir='Data'):
+    marker = os.path.join(data_dir, '.synth.json')
+    spec = {'rows': rows, 'seed': seed}
+    if os.path.isfile(marker):
+        with open(marker) as f:
+            if json.load(f) == spec:
+                print('[INFO] Reusing Synthetic Data :: {0}'.format(os.path.abspath(data_dir)))
+                return None
+    seconds, _ = timeit(lambda: generate(rows, data_dir, seed=seed))
+    with open(marker, 'w') as f:
+        json.dump(spec, f)
+    return entry(seconds, rows)
+
+
+def guarded(results, name, fn, *args):
+    try:
+        return fn(results, *args)
+    except ImportError as e:
+        print('[WARNING] Skipping Benchmark :: {0} :: {1}'.format(name, e))
+        results[name] = {'skipped': str(e)}
+    except Exception as e:
+        traceback.print_exc()
+        results[name] = {'error': '{0}: {1}'.format(type(e).__name__, e)}
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(rows, work_dir, repeat=1, batch_size=32, seed=1):
+    import pandas as pd
+    from utils import PLOT_FILES
+
+    meta = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'rows': rows,
+        'repeat': repeat,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'cpu_count': os.cpu_count(),
+    }
+    results = {}
+    cwd = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        generated = synth_data(rows, seed)
+        if generated:
+            results['generate'] = generated
+
+        df = bench_data(results, rows, repeat)
+        x = np.asarray(df.values[:, :-1], dtype=np.float32)
+        y = df['Understand'].values.astype(int)
+        prob = np.random.default_rng(seed).dirichlet(np.ones(2), len(y))
+
+        guarded(results, 'evaluate', bench_evaluate, y, prob, repeat)
+        for chart in PLOT_FILES:
+            guarded(results, 'plot_{0}'.format(chart.lower()), bench_plot, chart, y, prob, repeat,
+                    os.path.join('results', 'bench'))
+        model = guarded(results, 'train_epoch', bench_train_epoch, x, y, batch_size)
+        guarded(results, 'inference_affine', bench_affine, model, x, repeat, seed)
+        if model is not None:
+            guarded(results, 'inference_keras', bench_keras, model, x, repeat)
+    finally:
+        os.chdir(cwd)
+    return {'meta': meta, 'results': results}
+
+
+def compare(report, baseline, tolerance=TOLERANCE):
+    regressions = {}
+    for name, res in report['results'].items():
+        old = baseline.get('results', {}).get(name, {})
+        if 'seconds' not in res or 'seconds' not in old or res['rows'] != old.get('rows'):
+            continue
+        res['baseline_seconds'] = old['seconds']
+        res['ratio'] = round(res['seconds'] / max(old['seconds'], 1e-9), 3)
+        if res['ratio'] > 1 + tolerance:
+            regressions[name] = res['ratio']
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the data, evaluation, plotting, training and inference '
+                                                 'paths on synthetic EEG data')
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--work-dir', help='Directory holding Data/, reused across runs when the row count matches')
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--out', help='Write the JSON report to this path')
+    parser.add_argument('--baseline', help='Compare against a previous JSON report')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    if args.work_dir:
+        os.makedirs(args.work_dir, exist_ok=True)
+        report_ = run(args.rows, args.work_dir, args.repeat, args.batch_size, args.seed)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            report_ = run(args.rows, tmp, args.repeat, args.batch_size, args.seed)
+
+    regressions_ = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions_ = compare(report_, json.load(f), args.tolerance)
+        report_['regressions'] = regressions_
+    print(json.dumps(report_, indent=4))
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report_, f, indent=4)
+    if regressions_:
+        print('[WARNING] Benchmark Regressions :: {0}'.format(json.dumps(regressions_)))
+        sys.exit(1)
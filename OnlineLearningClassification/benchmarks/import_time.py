@@ -0,0 +1,56 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGETS_MS = {
+    'data_handler': 1500,
+    'performance_evaluator.metrics': 1000,
+    'utils': 1200,
+    'train': 2000,
+    'serve': 1500,
+}
+FORBIDDEN = ['tensorflow', 'PyQt5', 'matplotlib.pyplot']
+
+
+def import_time(module):
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import {0}'.format(module)],
+                          cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError('Importing {0} Failed :: {1}'.format(module, proc.stderr.strip().splitlines()[-1]))
+    imported = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = [v.strip() for v in line[len('import time:'):].split('|')]
+        imported[name.strip()] = int(cumulative) / 1000
+    return imported[module], sorted(m for m in FORBIDDEN if m in imported)
+
+
+def run(budgets):
+    results = {}
+    for module, budget in budgets.items():
+        ms, forbidden = import_time(module)
+        results[module] = {'ms': round(ms, 1), 'budget_ms': budget, 'forbidden': forbidden,
+                           'ok': ms <= budget and not forbidden}
+        print('[INFO] {0} :: {1:.1f} ms / {2} ms{3}'.format(
+            module, ms, budget, ' :: Imports {0}'.format(', '.join(forbidden)) if forbidden else ''))
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scale', type=float, default=1.0)
+    parser.add_argument('--out')
+    args = parser.parse_args()
+
+    res = run({m: b * args.scale for m, b in BUDGETS_MS.items()})
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(res, f, indent=4)
+    failed = [m for m, r in res.items() if not r['ok']]
+    if failed:
+        print('[WARNING] Import Budget Exceeded :: {0}'.format(', '.join(failed)))
+        sys.exit(1)
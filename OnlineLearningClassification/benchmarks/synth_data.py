@@ -0,0 +1,104 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from data_handler import EEG_PATH, SUBJECT_PATH, VIDEO_PATH  # noqa: E402
+
+N_SUBJECTS = 10
+N_VIDEOS = 10
+N_FEATURES = 84
+CHUNK_SIZE = 200000
+SCALE = 1000
+CLIP = 8
+MIN_ROWS = 10000
+MAX_ROWS = 50000000
+GENDERS = ['F', 'M']
+ETHNICITIES = ['A', 'B', 'C']
+FIELDS = ['Art', 'Bio', 'CS', 'Math']
+INSTRUCTORS = ['I1', 'I2', 'I3']
+
+
+def subject_details(n_subjects=N_SUBJECTS, seed=1):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Subject_ID': np.arange(1, n_subjects + 1),
+        'Gender': rng.choice(GENDERS, n_subjects),
+        'Age': rng.integers(18, 40, n_subjects),
+        'Ethnicity': rng.choice(ETHNICITIES, n_subjects),
+        'Field_of_Interest': rng.choice(FIELDS, n_subjects),
+    })
+
+
+def video_details(n_videos=N_VIDEOS, seed=1):
+    rng = np.random.default_rng(seed + 1)
+    return pd.DataFrame({
+        'Video_ID': np.arange(1, n_videos + 1),
+        'Title': ['T{0}'.format(i) for i in range(n_videos)],
+        'Len': rng.integers(1, 6, n_videos),
+        'Instructor': rng.choice(INSTRUCTORS, n_videos),
+    })
+
+
+def value_table(clip=CLIP, scale=SCALE):
+    return np.array(['{0:.3f}'.format(i / scale) for i in range(-clip * scale, clip * scale + 1)], dtype=object)
+
+
+def eeg_chunk(rows, weights, n_subjects=N_SUBJECTS, n_videos=N_VIDEOS, seed=1):
+    rng = np.random.default_rng(seed)
+    x = np.clip(np.rint(rng.normal(size=(rows, len(weights))) * SCALE), -CLIP * SCALE, CLIP * SCALE).astype(np.int64)
+    logits = x @ weights / SCALE + rng.normal(scale=0.5, size=rows)
+    ids = np.stack([rng.integers(1, n_videos + 1, rows), rng.integers(1, n_subjects + 1, rows)], axis=1)
+    return ids, x, (logits > 0).astype(int)
+
+
+def format_chunk(ids, x, labels, table):
+    cells = np.empty((len(x), x.shape[1] + 3), dtype=object)
+    cells[:, :2] = ids.astype(str)
+    cells[:, 2:-1] = table[x + CLIP * SCALE]
+    cells[:, -1] = labels.astype(str)
+    return ''.join(','.join(row) + '\n' for row in cells.tolist())
+
+
+def generate(rows, data_dir='Data', n_subjects=N_SUBJECTS, n_videos=N_VIDEOS, n_features=N_FEATURES,
+             chunk_size=CHUNK_SIZE, seed=1):
+    if not MIN_ROWS <= rows <= MAX_ROWS:
+        print('[WARNING] Rows Outside Supported Range {0}-{1} :: {2}'.format(MIN_ROWS, MAX_ROWS, rows))
+    os.makedirs(data_dir, exist_ok=True)
+    paths = [os.path.join(data_dir, os.path.basename(p)) for p in [SUBJECT_PATH, VIDEO_PATH, EEG_PATH]]
+    subject_details(n_subjects, seed).to_csv(paths[0], index=False)
+    video_details(n_videos, seed).to_csv(paths[1], index=False)
+
+    weights = np.random.default_rng(seed).normal(size=n_features) / np.sqrt(n_features)
+    table = value_table()
+    header = ['video_id', 'subject_id', *['f{0}'.format(i) for i in range(n_features)], 'subject_understood']
+    print('[INFO] Writing Synthetic EEG Data :: {0} :: Rows :: {1}'.format(paths[2], rows))
+    t1 = time.perf_counter()
+    with open(paths[2], 'w', newline='') as f:
+        f.write(','.join(header) + '\n')
+        for i, start in enumerate(range(0, rows, chunk_size)):
+            ids, x, labels = eeg_chunk(min(chunk_size, rows - start), weights, n_subjects, n_videos, seed + i + 1)
+            f.write(format_chunk(ids, x, labels, table))
+            print('[INFO] Chunk :: {0} | Rows Written :: {1}'.format(i + 1, start + len(x)))
+    print('[INFO] Computational Time :: {0:.2f} secs'.format(time.perf_counter() - t1))
+    return paths
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate synthetic Subject/Video/EEG CSVs in the data_handler schema')
+    parser.add_argument('--rows', type=int, default=MIN_ROWS)
+    parser.add_argument('--data-dir', default='Data')
+    parser.add_argument('--subjects', type=int, default=N_SUBJECTS)
+    parser.add_argument('--videos', type=int, default=N_VIDEOS)
+    parser.add_argument('--features', type=int, default=N_FEATURES)
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    generate(args.rows, args.data_dir, args.subjects, args.videos, args.features, args.chunk_size, args.seed)
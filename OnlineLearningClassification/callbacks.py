@@ -0,0 +1,114 @@
+import os
+import time
+from functools import partial
+
+import numpy as np
+import pandas as pd
+from tensorflow.python.keras.callbacks import (Callback, EarlyStopping, LearningRateScheduler, ModelCheckpoint,
+                                               ReduceLROnPlateau)
+
+from affine import write_model_config
+from model import LEARNING_RATE
+from performance_evaluator.metrics import confusion_matrix, kappa_score
+from utils import ACC_LOSS_COLS, CLASSES, MONITOR_MODES, PLOT_MAX_RATE, TelemetryWriter, render_telemetry
+
+BATCH_SIZE = 1024
+MIN_LR = 1e-6
+LR_FACTOR = 0.5
+LR_PATIENCE = 2
+
+
+class TrainingCallback(Callback):
+    def __init__(self, acc_loss_path, plt1, plt2, max_rate=PLOT_MAX_RATE, render=False):
+        self.acc_loss_path = acc_loss_path
+        self.plt1 = plt1
+        self.plt2 = plt2
+        self.min_interval = 1.0 / max_rate if max_rate and max_rate > 0 else 0.0
+        self.render = render
+        self.last_render = 0.0
+        if os.path.isfile(self.acc_loss_path):
+            self.rows = pd.read_csv(self.acc_loss_path).values.tolist()
+        else:
+            self.rows = []
+            pd.DataFrame([], columns=ACC_LOSS_COLS).to_csv(self.acc_loss_path, index=False)
+        self.writer = None
+        Callback.__init__(self)
+
+    def on_train_begin(self, logs=None):
+        self.writer = TelemetryWriter(self.acc_loss_path, self.plt1, self.plt2, self.rows)
+        self.writer.start()
+
+    def on_epoch_end(self, epoch, logs=None):
+        row = [
+            int(epoch + 1), round(logs['accuracy'], 4), round(logs['val_accuracy'], 4),
+            round(logs['loss'], 4), round(logs['val_loss'], 4)
+        ]
+        self.rows.append(row)
+        self.writer.put(row)
+        print('[EPOCH :: {0}] -> Acc :: {1} | Val_Acc :: {2} | Loss :: {3} | Val_Loss :: {4}'.format(
+            epoch + 1, *[format(v, '.4f') for v in row[1:]]
+        ))
+        if self.render and time.monotonic() - self.last_render >= self.min_interval:
+            self.last_render = time.monotonic()
+            render_telemetry()
+
+    def on_train_end(self, logs=None):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        if self.render:
+            render_telemetry()
+
+
+class ValidationKappa(Callback):
+    def __init__(self, x, y, batch_size=BATCH_SIZE):
+        self.x = x
+        self.y = np.asarray(y, dtype=np.int64)
+        self.batch_size = batch_size
+        Callback.__init__(self)
+
+    def on_epoch_end(self, epoch, logs=None):
+        pred = np.argmax(self.model.predict(self.x, batch_size=self.batch_size), axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            kappa = kappa_score(confusion_matrix(self.y, pred, len(CLASSES)))
+        if logs is not None:
+            logs['val_kappa'] = float(np.nan_to_num(kappa))
+
+
+class ConfigCheckpoint(ModelCheckpoint):
+    def on_epoch_end(self, epoch, logs=None):
+        super().on_epoch_end(epoch, logs)
+        if os.path.isfile(self.filepath):
+            write_model_config(self.model, self.filepath)
+
+
+def cosine_lr(epoch, current_lr, start, epochs, lr=LEARNING_RATE, min_lr=MIN_LR):
+    progress = min(max(epoch - start, 0) / max(epochs - start, 1), 1)
+    return min_lr + 0.5 * (lr - min_lr) * (1 + np.cos(np.pi * progress))
+
+
+def lr_schedule(name, monitor, start, epochs, lr=LEARNING_RATE, factor=LR_FACTOR, patience=LR_PATIENCE,
+                min_lr=MIN_LR):
+    if name == 'plateau':
+        return ReduceLROnPlateau(monitor=monitor, mode=MONITOR_MODES[monitor], factor=factor,
+                                 patience=patience, min_lr=min_lr, verbose=0)
+    if name == 'cosine':
+        return LearningRateScheduler(partial(cosine_lr, start=start, epochs=epochs, lr=lr, min_lr=min_lr))
+    if name == 'none':
+        return None
+    raise ValueError('Unknown LR Schedule :: {0}'.format(name))
+
+
+def fit_callbacks(model_path, monitor, patience, schedule, start, epochs, val_x, val_y):
+    if monitor not in MONITOR_MODES:
+        raise ValueError('Unknown Monitor :: {0}'.format(monitor))
+    mode = MONITOR_MODES[monitor]
+    cbs = [ValidationKappa(val_x, val_y)] if monitor == 'val_kappa' else []
+    cbs.append(ConfigCheckpoint(model_path, save_best_only=True, save_weights_only=True,
+                                monitor=monitor, mode=mode, verbose=False))
+    if patience:
+        cbs.append(EarlyStopping(monitor=monitor, mode=mode, patience=patience, verbose=0))
+    sched = lr_schedule(schedule, monitor, start, epochs)
+    if sched is not None:
+        cbs.append(sched)
+    return cbs
@@ -0,0 +1,168 @@
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_MISSING_INPUT = 3
+
+
+def run_load(ctx, args):
+    from data_handler import load_data
+    ctx['raw'] = load_data()
+
+
+def run_merge(ctx, args):
+    from data_handler import merge_data
+    if 'raw' not in ctx:
+        run_load(ctx, args)
+    ctx['merged'] = merge_data(*ctx['raw'])
+
+
+def run_preprocess(ctx, args):
+    from data_handler import MERGED_PATH, preprocess_data
+    if 'merged' not in ctx:
+        from data_cache import read_csv_cached
+        ctx['merged'] = read_csv_cached(MERGED_PATH)
+    ctx['preprocessed'] = preprocess_data(ctx['merged'])
+
+
+def run_stream(ctx, args):
+    from data_handler import CHUNK_SIZE, stream_data
+    stream_data(args.chunk_size or CHUNK_SIZE)
+
+
+def fit_options(args, train):
+    return {
+        'patience': train.PATIENCE if args.patience is None else args.patience,
+        'monitor': args.monitor or train.MONITOR,
+        'lr_schedule': args.lr_schedule or train.LR_SCHEDULE,
+    }
+
+
+def run_train(ctx, args):
+    import train
+    from utils import render_telemetry
+    evaluated = train.train(use_tf_data=args.tf_data, batch_size=args.batch_size or train.BATCH_SIZE,
+                            plots=not args.no_plots, epochs=args.epochs or train.EPOCHS, render_plots=False,
+                            **fit_options(args, train))
+    render_telemetry()
+    ctx['metrics'] = evaluated[0] if evaluated else None
+    ctx['training'] = train.read_training_summary()
+
+
+def run_incremental(ctx, args):
+    import train
+    from utils import render_telemetry
+    evaluated = train.train_incremental(plots=not args.no_plots, epochs=args.epochs or train.ONLINE_EPOCHS,
+                                        render_plots=False, **fit_options(args, train))
+    render_telemetry()
+    ctx['metrics'] = evaluated[0] if evaluated else None
+    ctx['training'] = train.read_training_summary()
+
+
+def run_pipeline(ctx, args):
+    import train
+    from pipeline import build_pipeline
+    dag = build_pipeline(use_tf_data=args.tf_data, batch_size=args.batch_size or train.BATCH_SIZE,
+                         plots=not args.no_plots, epochs=args.epochs or train.EPOCHS, **fit_options(args, train))
+    force = True if args.force == [] else args.force
+    ctx['stages'] = dag.run(force=force)
+    ctx['metrics'] = {split: dag.outputs['evaluate_{0}'.format(split.lower())] for split in train.SPLITS
+                      if 'evaluate_{0}'.format(split.lower()) in dag.outputs}
+    ctx['training'] = train.read_training_summary()
+
+
+STAGES = {
+    'load': run_load,
+    'merge': run_merge,
+    'preprocess': run_preprocess,
+    'stream': run_stream,
+    'train': run_train,
+    'incremental': run_incremental,
+    'pipeline': run_pipeline,
+}
+
+
+def metrics_to_dict(metrics):
+    if not metrics:
+        return {}
+    return {k: dict(zip(m.overall_metrics['Metrics'], m.overall_metrics['Values'].astype(float)))
+            for k, m in metrics.items()}
+
+
+def run(stages, args):
+    ctx = {}
+    report = {'command': args.command, 'stages': [], 'exit_code': EXIT_OK}
+    t0 = time.perf_counter()
+    for name in stages:
+        print('[INFO] Running Stage :: {0}'.format(name))
+        t1 = time.perf_counter()
+        status = 'ok'
+        try:
+            STAGES[name](ctx, args)
+        except FileNotFoundError as e:
+            print('[WARNING] Missing Input For Stage :: {0} :: {1}'.format(name, e))
+            status, report['exit_code'] = 'missing_input', EXIT_MISSING_INPUT
+        except Exception:
+            traceback.print_exc()
+            status, report['exit_code'] = 'failed', EXIT_FAILED
+        seconds = time.perf_counter() - t1
+        report['stages'].extend(ctx.pop('stages', []))
+        report['stages'].append({'name': name, 'status': status, 'seconds': round(seconds, 3)})
+        print('[INFO] Stage :: {0} :: {1} :: {2:.3f} secs'.format(name, status, seconds))
+        if status != 'ok':
+            break
+    report['total_seconds'] = round(time.perf_counter() - t0, 3)
+    report['metrics'] = metrics_to_dict(ctx.get('metrics'))
+    if ctx.get('training'):
+        report['training'] = ctx['training']
+    return report
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Headless runner for the online learning pipeline')
+    parser.add_argument('--report', help='Write the run report as JSON to this path')
+    parser.add_argument('--json', action='store_true', help='Print the run report as JSON')
+    sub = parser.add_subparsers(dest='command', required=True)
+    for name in ['load', 'merge', 'preprocess', 'stream', 'train', 'incremental', 'pipeline']:
+        p = sub.add_parser(name)
+        p.add_argument('--no-plots', action='store_true', help='Skip rendering figures')
+        if name == 'stream':
+            p.add_argument('--chunk-size', type=int)
+        if name in ('train', 'pipeline'):
+            p.add_argument('--tf-data', action='store_true')
+            p.add_argument('--batch-size', type=int)
+        if name in ('train', 'incremental', 'pipeline'):
+            p.add_argument('--epochs', type=int, help='Maximum number of epochs')
+            p.add_argument('--patience', type=int, help='Early stopping patience, 0 disables it')
+            p.add_argument('--monitor', choices=['val_loss', 'val_accuracy', 'val_kappa'])
+            p.add_argument('--lr-schedule', choices=['plateau', 'cosine', 'none'])
+        if name == 'pipeline':
+            p.add_argument('--force', nargs='*', metavar='STAGE',
+                           help='Re-run the given stages, or every stage when none are given')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    os.environ['MPLBACKEND'] = 'Agg'
+    import train
+    train.BACKEND = 'Agg'
+
+    report = run([args.command], args)
+    if args.report:
+        os.makedirs(os.path.dirname(os.path.abspath(args.report)), exist_ok=True)
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=4)
+    if args.json:
+        print(json.dumps(report))
+    return report['exit_code']
+
+
+if __name__ == '__main__':
+    sys.exit(main())
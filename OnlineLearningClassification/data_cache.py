@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def file_hash(path):
+    sha = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def cache_paths(csv_path):
+    base = os.path.splitext(csv_path)[0]
+    return base + '.x.npy', base + '.y.npy', base + '.pkl', base + '.cache.json'
+
+
+def source_info(csv_path):
+    st = os.stat(csv_path)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def write_meta(csv_path, meta):
+    meta.update(source_info(csv_path))
+    meta['hash'] = file_hash(csv_path)
+    with open(cache_paths(csv_path)[3], 'w') as f:
+        json.dump(meta, f, indent=4)
+
+
+def read_meta(csv_path):
+    meta_path = cache_paths(csv_path)[3]
+    if not os.path.isfile(csv_path) or not os.path.isfile(meta_path):
+        return None
+    with open(meta_path) as f:
+        meta = json.load(f)
+    info = source_info(csv_path)
+    if all(meta.get(k) == v for k, v in info.items()):
+        return meta
+    if meta.get('hash') != file_hash(csv_path):
+        return None
+    meta.update(info)
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f, indent=4)
+    return meta
+
+
+def write_cache(df, csv_path):
+    x_path, y_path, pkl_path, _ = cache_paths(csv_path)
+    numeric = len(df._get_numeric_data().columns) == len(df.columns)
+    if numeric:
+        features = df.iloc[:, :-1]
+        np.save(x_path, features.to_numpy(dtype=np.result_type(*features.dtypes)))
+        np.save(y_path, df.iloc[:, -1].to_numpy())
+    else:
+        df.to_pickle(pkl_path)
+    print('[INFO] Saving Binary Cache :: {0}'.format(', '.join([x_path, y_path]) if numeric else pkl_path))
+    write_meta(csv_path, {'format': 'npy' if numeric else 'pkl', 'columns': list(df.columns)})
+
+
+def write_csv_cache(csv_path, rows, chunk_size, dtype=None, label_dtype=None):
+    x_path, y_path = cache_paths(csv_path)[:2]
+    columns = list(pd.read_csv(csv_path, nrows=0).columns)
+    x_arr, y_arr = None, None
+    start = 0
+    for chunk in pd.read_csv(csv_path, chunksize=chunk_size):
+        features, labels = chunk.iloc[:, :-1], chunk.iloc[:, -1]
+        if x_arr is None:
+            x_arr = np.lib.format.open_memmap(x_path, mode='w+', dtype=dtype or np.result_type(*features.dtypes),
+                                              shape=(rows, len(columns) - 1))
+            y_arr = np.lib.format.open_memmap(y_path, mode='w+', dtype=label_dtype or labels.dtype, shape=(rows,))
+        x_arr[start:start + len(chunk)] = features.to_numpy()
+        y_arr[start:start + len(chunk)] = labels.to_numpy()
+        start += len(chunk)
+    if x_arr is None:
+        return
+    x_arr.flush()
+    y_arr.flush()
+    del x_arr, y_arr
+    print('[INFO] Saving Binary Cache :: {0}, {1}'.format(x_path, y_path))
+    write_meta(csv_path, {'format': 'npy', 'columns': columns})
+
+
+def load_cache(csv_path):
+    meta = read_meta(csv_path)
+    if meta is None:
+        return None
+    x_path, y_path, pkl_path, _ = cache_paths(csv_path)
+    if meta['format'] == 'npy' and os.path.isfile(x_path) and os.path.isfile(y_path):
+        print('[INFO] Loading Binary Cache :: {0}, {1}'.format(x_path, y_path))
+        df = pd.DataFrame(np.load(x_path, mmap_mode='r'), columns=meta['columns'][:-1], copy=False)
+        df[meta['columns'][-1]] = np.load(y_path, mmap_mode='r')
+        return df
+    if meta['format'] == 'pkl' and os.path.isfile(pkl_path):
+        print('[INFO] Loading Binary Cache :: {0}'.format(pkl_path))
+        return pd.read_pickle(pkl_path)
+    return None
+
+
+def read_csv_cached(csv_path):
+    df = load_cache(csv_path)
+    if df is None:
+        print('[INFO] Loading CSV :: {0}'.format(csv_path))
+        df = pd.read_csv(csv_path)
+        write_cache(df, csv_path)
+    return df
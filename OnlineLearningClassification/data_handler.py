@@ -1,92 +1,197 @@
-import json
 import sys
 
+import numpy as np
 import pandas as pd
-import tqdm
 
+from data_cache import write_cache, write_csv_cache
+from encoder import CategoricalEncoder
 from utils import print_df_to_table
 
 SUBJECT_PATH = 'Data/Subject_details.csv'
 VIDEO_PATH = 'Data/Video_details.csv'
 EEG_PATH = 'Data/EEG_data.csv'
+MERGED_PATH = 'Data/merged.csv'
+PREPROCESSED_PATH = 'Data/preprocessed.csv'
+CHUNK_SIZE = 100000
+
+VID_COLS = ['Video_ID', 'Video_Title', 'Video_Instructor']
+SUB_COLS = ['Subject_ID', 'Subject_Gender', 'Subject_Age', 'Subject_FOI']
+ENCODED_COLS = SUB_COLS + VID_COLS
 
 
 def show_count(df, class_col):
+    print_count(df[class_col].value_counts(sort=False), class_col)
+    return df
+
+
+def print_count(cvc, class_col):
     print('[INFO] {0} Distribution'.format(class_col.title()))
-    cvc = df[class_col].value_counts(sort=False)
     sdf = cvc.to_frame()
     sdf.insert(0, 'Class', cvc.index)
     sdf.columns = [class_col.title(), 'Count']
     print_df_to_table(sdf)
+
+
+def compact_dtypes(df):
+    for col in df.columns:
+        if pd.api.types.is_integer_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+        elif pd.api.types.is_float_dtype(df[col]):
+            df[col] = df[col].astype(np.float32)
     return df
 
 
-def replace_categorical_cols(df, except_col):
+def get_categorical_cols(df, except_col):
     cat_cols = list(set(df.columns) - set(df._get_numeric_data().columns))
+    cat_cols += [col for col in ENCODED_COLS if col in df.columns and col not in cat_cols]
+    return [col for col in cat_cols if col != except_col]
+
+
+def replace_categorical_cols(df, except_col, encoder=None):
+    cat_cols = get_categorical_cols(df, except_col)
+    if encoder is None:
+        encoder = CategoricalEncoder().load(cat_cols)
     for col in cat_cols:
-        if col == except_col:
-            continue
         print('[INFO] Replacing Categorical Values in Column :: {0}'.format(col))
         show_count(df, col)
-        rpd = {v: k + 1 for k, v in enumerate(sorted(df[col].unique()))}
-        df[col].replace(rpd, inplace=True)
-        with open('Data/{0}.json'.format(col.replace('/', '(or)')), 'w') as f:
-            json.dump(rpd, f, indent=4, sort_keys=False)
+    encoder.partial_fit(df, cat_cols)
+    df = encoder.transform(df, cat_cols)
+    encoder.save()
     df.reset_index(drop=True, inplace=True)
     return df
 
 
-def load_data():
+def load_lookup_data():
     print('[INFO] Loading Subject Details :: {0}'.format(SUBJECT_PATH))
     s_df = pd.read_csv(SUBJECT_PATH)
     print('[INFO] Data Shape :: {0}'.format(s_df.shape))
     print('[INFO] Loading VIDEO Details :: {0}'.format(VIDEO_PATH))
     v_df = pd.read_csv(VIDEO_PATH)
     print('[INFO] Data Shape :: {0}'.format(v_df.shape))
+    return s_df, v_df
+
+
+def load_data():
+    s_df, v_df = load_lookup_data()
     print('[INFO] Loading EEG DATA :: {0}'.format(EEG_PATH))
     e_df = pd.read_csv(EEG_PATH)
     print('[INFO] Data Shape :: {0}'.format(e_df.shape))
     return s_df, v_df, e_df
 
 
-def merge_data(s_df, v_df, e_df):
-    vid_data = []
-    sub_data = []
-    print('[INFO] Mergin')
-    for row in tqdm.tqdm(e_df.values, desc='[INFO] Merging Video and Subject Data :', file=sys.stdout):
-        sub_v_df = v_df[v_df['Video_ID'] == int(row[0])].values[0]
-        vid_data.append([
-            sub_v_df[0], sub_v_df[1], sub_v_df[-1]
-        ])
-        sub_s_df = s_df[s_df['Subject_ID'] == int(row[1])].values[0]
-        sub_data.append([
-            sub_s_df[0], sub_s_df[1], sub_s_df[2], sub_s_df[4]
-        ])
-
-    print('[INFO] Merging Data')
+def build_key_index(df, key_col, cols, names):
+    lk_df = df.drop_duplicates(subset=key_col, keep='first').iloc[:, cols]
+    lk_df.columns = names
+    lk_df = lk_df.reset_index(drop=True)
+    return pd.Index(lk_df[key_col].astype(int)), lk_df
+
+
+def lookup_keys(index, keys, key_col):
+    pos = index.get_indexer(keys)
+    unmatched = pos == -1
+    if unmatched.any():
+        print('[WARNING] Unmatched {0} :: {1} :: {2} Rows'.format(
+            key_col, sorted(set(keys[unmatched].tolist())), int(unmatched.sum())
+        ))
+    return pos
+
+
+def build_lookups(s_df, v_df):
+    v_idx, v_lk = build_key_index(v_df, 'Video_ID', [0, 1, -1], VID_COLS)
+    s_idx, s_lk = build_key_index(s_df, 'Subject_ID', [0, 1, 2, 4], SUB_COLS)
+    return v_idx, v_lk, s_idx, s_lk
+
+
+def join_data(lookups, e_df):
+    v_idx, v_lk, s_idx, s_lk = lookups
+    v_pos = lookup_keys(v_idx, e_df.iloc[:, 0].values.astype(int), 'Video_ID')
+    s_pos = lookup_keys(s_idx, e_df.iloc[:, 1].values.astype(int), 'Subject_ID')
+    matched = (v_pos != -1) & (s_pos != -1)
+    if not matched.all():
+        print('[WARNING] Dropping {0} Unmatched EEG Rows'.format(int((~matched).sum())))
+        e_df = e_df[matched]
+        v_pos, s_pos = v_pos[matched], s_pos[matched]
+
     eeg_cols = list(e_df.columns)[2:-1]
-    vid_cols = ['Video_ID', 'Video_Title', 'Video_Instructor']
-    sub_cols = ['Subject_ID', 'Subject_Gender', 'Subject_Age', 'Subject_FOI']
-    e_df[vid_cols] = vid_data
-    e_df[sub_cols] = sub_data
-    e_df['Understand'] = e_df['subject_understood']
-    df = e_df[sub_cols + vid_cols + eeg_cols + ['Understand']]
+    sub_df = s_lk.take(s_pos)
+    sub_df.index = e_df.index
+    vid_df = v_lk.take(v_pos)
+    vid_df.index = e_df.index
+    understand = e_df['subject_understood'].rename('Understand')
+    return pd.concat([sub_df, vid_df, e_df[eeg_cols], understand], axis=1)
+
+
+def merge_data(s_df, v_df, e_df):
+    print('[INFO] Merging Video and Subject Data')
+    df = join_data(build_lookups(s_df, v_df), e_df)
     print('[INFO] Data Shape After Merged :: {0}'.format(df.shape))
-    dp = 'Data/merged.csv'
+    dp = MERGED_PATH
     print('[INFO] Saving Merged Data :: {0}'.format(dp))
     df.to_csv(dp, index=False)
+    write_cache(df, dp)
     return df
 
 
 def preprocess_data(df):
     print('INFO] PreProcessing')
-    df = replace_categorical_cols(df, 'Understand')
+    df = compact_dtypes(replace_categorical_cols(df, 'Understand'))
     show_count(df, 'Understand')
-    dp = 'Data/preprocessed.csv'
+    dp = PREPROCESSED_PATH
     print('[INFO] Saving Preprocessed Data :: {0}'.format(dp))
     df.to_csv(dp, index=False)
+    write_cache(df, dp)
     return df
 
 
+def fit_lookup_categorical_cols(lookups, v_keys, s_keys, except_col):
+    v_idx, v_lk, s_idx, s_lk = lookups
+    v_lk = v_lk[v_idx.isin(v_keys)]
+    s_lk = s_lk[s_idx.isin(s_keys)]
+    s_cols = get_categorical_cols(s_lk, except_col)
+    v_cols = get_categorical_cols(v_lk, except_col)
+    encoder = CategoricalEncoder().load(s_cols + v_cols)
+    encoder.partial_fit(s_lk, s_cols)
+    encoder.partial_fit(v_lk, v_cols)
+    return encoder
+
+
+def append_csv(df, path, first):
+    df.to_csv(path, mode='w' if first else 'a', header=first, index=False)
+
+
+def stream_data(chunk_size=CHUNK_SIZE):
+    s_df, v_df = load_lookup_data()
+    lookups = build_lookups(s_df, v_df)
+
+    print('[INFO] Scanning EEG Keys :: {0}'.format(EEG_PATH))
+    v_keys, s_keys = set(), set()
+    for chunk in pd.read_csv(EEG_PATH, chunksize=chunk_size, usecols=[0, 1]):
+        v_keys.update(chunk.iloc[:, 0].astype(int).unique().tolist())
+        s_keys.update(chunk.iloc[:, 1].astype(int).unique().tolist())
+    encoder = fit_lookup_categorical_cols(lookups, list(v_keys), list(s_keys), 'Understand')
+    encoder.save()
+
+    print('[INFO] Streaming EEG DATA :: {0} :: Chunk Size :: {1}'.format(EEG_PATH, chunk_size))
+    rows = 0
+    counts = pd.Series(dtype=int)
+    for i, chunk in enumerate(pd.read_csv(EEG_PATH, chunksize=chunk_size)):
+        m_df = join_data(lookups, chunk)
+        append_csv(m_df, MERGED_PATH, i == 0)
+        p_df = encoder.transform(m_df)
+        append_csv(p_df, PREPROCESSED_PATH, i == 0)
+        counts = counts.add(p_df['Understand'].value_counts(sort=False), fill_value=0)
+        rows += len(p_df)
+        print('[INFO] Chunk :: {0} | Rows Written :: {1}'.format(i + 1, rows))
+
+    print('[INFO] Saved Merged Data :: {0}'.format(MERGED_PATH))
+    print('[INFO] Saved Preprocessed Data :: {0}'.format(PREPROCESSED_PATH))
+    write_csv_cache(PREPROCESSED_PATH, rows, chunk_size, np.float32, np.int8)
+    print_count(counts.astype(int), 'Understand')
+    return rows
+
+
 if __name__ == '__main__':
-    preprocess_data(merge_data(*load_data()))
+    if '--stream' in sys.argv:
+        stream_data()
+    else:
+        preprocess_data(merge_data(*load_data()))
@@ -0,0 +1,62 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+VOCAB_DIR = 'Data'
+UNKNOWN_CODE = 0
+
+
+def vocab_path(col, vocab_dir=VOCAB_DIR):
+    return os.path.join(vocab_dir, '{0}.json'.format(col.replace('/', '(or)')))
+
+
+class CategoricalEncoder:
+    def __init__(self, vocab_dir=VOCAB_DIR):
+        self.vocab_dir = vocab_dir
+        self.mappings = {}
+        self._lookups = {}
+
+    def set_mapping(self, col, rpd):
+        self.mappings[col] = rpd
+        self._lookups[col] = (pd.Index(list(rpd.keys())), np.array(list(rpd.values()), dtype=int))
+
+    def load(self, cols):
+        for col in cols:
+            path = vocab_path(col, self.vocab_dir)
+            if col not in self.mappings and os.path.isfile(path):
+                with open(path) as f:
+                    self.set_mapping(col, json.load(f))
+        return self
+
+    def save(self):
+        os.makedirs(self.vocab_dir, exist_ok=True)
+        for col, rpd in self.mappings.items():
+            with open(vocab_path(col, self.vocab_dir), 'w') as f:
+                json.dump(rpd, f, indent=4, sort_keys=False)
+
+    def partial_fit(self, df, cols):
+        for col in cols:
+            rpd = dict(self.mappings.get(col, {}))
+            new = [str(v) for v in sorted(df[col].unique()) if str(v) not in rpd]
+            if not new:
+                continue
+            start = max(rpd.values(), default=UNKNOWN_CODE)
+            rpd.update({v: start + k + 1 for k, v in enumerate(new)})
+            self.set_mapping(col, rpd)
+        return self
+
+    def transform_col(self, values, col):
+        index, codes = self._lookups[col]
+        pos = index.get_indexer(np.asarray(values).astype(str))
+        unseen = pos == -1
+        if unseen.any():
+            print('[WARNING] Unseen Categories in Column :: {0} :: {1} Rows'.format(col, int(unseen.sum())))
+        return np.where(unseen, UNKNOWN_CODE, codes[pos])
+
+    def transform(self, df, cols=None):
+        df = df.copy(deep=False)
+        for col in self.mappings if cols is None else cols:
+            df[col] = self.transform_col(df[col].values, col)
+        return df
@@ -6,16 +6,17 @@ if True:
 import sys
 
 import pandas as pd
-from PyQt5.QtCore import Qt, QThreadPool
+from PyQt5.QtCore import Qt, QThreadPool, QTimer
 from PyQt5.QtGui import QFont, QTextCursor, QTextOption
 from PyQt5.QtWidgets import (QWidget, QApplication, QGridLayout, QGroupBox, QVBoxLayout, QPushButton,
                              QScrollArea, QMessageBox, QPlainTextEdit, QFrame, QTableView,
-                             QAbstractItemView, QLabel)
+                             QAbstractItemView, QLabel, QHBoxLayout, QComboBox, QLineEdit)
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
 
 import train
 from data_handler import load_data, preprocess_data, merge_data
-from utils import Stream, Worker, PandasDfToPyqtTable
+from qt_utils import PandasDfToPyqtTable, Worker
+from utils import BufferedStream, LOG_FLUSH_MS, LOG_MAX_BLOCKS, PLOT_MAX_RATE, render_telemetry, show_image
 
 
 class MainGUI(QWidget):
@@ -95,6 +96,7 @@ class MainGUI(QWidget):
         self.progress_pte.setFrameShape(QFrame.NoFrame)
         self.progress_pte.setReadOnly(True)
         self.progress_pte.setWordWrapMode(QTextOption.WordWrap)
+        self.progress_pte.setMaximumBlockCount(LOG_MAX_BLOCKS)
         self.grid_3.addWidget(self.progress_pte, 0, 0)
 
         self.gb_4 = QGroupBox('Visualization')
@@ -122,7 +124,14 @@ class MainGUI(QWidget):
 
         self.thread_pool = QThreadPool()
 
-        sys.stdout = Stream(fn=self.update_progress)
+        self.log_stream = BufferedStream()
+        sys.stdout = self.log_stream
+        self.log_timer = QTimer(self)
+        self.log_timer.timeout.connect(self.flush_progress)
+        self.log_timer.start(LOG_FLUSH_MS)
+        self.plot_timer = QTimer(self)
+        self.plot_timer.timeout.connect(render_telemetry)
+        self.plot_timer.start(int(1000 / PLOT_MAX_RATE))
 
         self.original_df = []
         self.mg_df = pd.DataFrame()
@@ -135,10 +144,20 @@ class MainGUI(QWidget):
         self.setLayout(self.main_layout)
         self.showMaximized()
 
+    def flush_progress(self):
+        text = self.log_stream.drain()
+        if text:
+            self.update_progress(text)
+
     def update_progress(self, text):
         cursor = self.progress_pte.textCursor()
         cursor.movePosition(QTextCursor.End)
-        cursor.insertText(text)
+        parts = text.split('\r')
+        cursor.insertText(parts[0])
+        for part in parts[1:]:
+            cursor.movePosition(QTextCursor.StartOfBlock, QTextCursor.KeepAnchor)
+            cursor.removeSelectedText()
+            cursor.insertText(part)
         self.progress_pte.setTextCursor(cursor)
         self.progress_pte.ensureCursorVisible()
 
@@ -149,10 +168,31 @@ class MainGUI(QWidget):
         table_view.setFixedHeight((self.gb_2.height() // 100) * 95)
         table_view.setModel(model)
         table_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table_view.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        table_view.setSortingEnabled(True)
         table_view.verticalHeader().hide()
         table_view.resizeColumnsToContents()
-        self.grid_2.addWidget(
-            table_view, self.grid_2.count() + 1, 0, Qt.AlignHCenter)
+
+        filter_widget = QWidget()
+        filter_widget.setFixedWidth(table_view.width())
+        filter_layout = QHBoxLayout(filter_widget)
+        filter_layout.setContentsMargins(0, 0, 0, 0)
+        filter_col = QComboBox()
+        filter_col.addItems([str(c) for c in df.columns])
+        filter_text = QLineEdit()
+        filter_text.setPlaceholderText('Filter (press Enter)')
+        filter_layout.addWidget(filter_col)
+        filter_layout.addWidget(filter_text)
+
+        def apply_filter():
+            model.set_filter(filter_col.currentIndex(), filter_text.text())
+
+        filter_text.returnPressed.connect(apply_filter)
+        filter_col.currentIndexChanged.connect(apply_filter)
+
+        row = self.grid_2.count() + 1
+        self.grid_2.addWidget(filter_widget, row, 0, Qt.AlignHCenter)
+        self.grid_2.addWidget(table_view, row + 1, 0, Qt.AlignHCenter)
 
     def add_plot(self, fig, title):
         canvas = FigureCanvasQTAgg(figure=fig)
@@ -173,7 +213,7 @@ class MainGUI(QWidget):
 
     def load_finisher(self):
         for df in self.original_df:
-            self.add_table(df.head(100))
+            self.add_table(df)
         self.mg_btn.setEnabled(True)
 
     def mg_thread(self):
@@ -183,10 +223,10 @@ class MainGUI(QWidget):
         self.mg_btn.setEnabled(False)
 
     def mg_runner(self):
-        self.mg_df = merge_data(*[c.copy() for c in self.original_df])
+        self.mg_df = merge_data(*self.original_df)
 
     def mg_finisher(self):
-        self.add_table(self.mg_df.head(100))
+        self.add_table(self.mg_df)
         self.pp_btn.setEnabled(True)
 
     def pp_thread(self):
@@ -196,19 +236,28 @@ class MainGUI(QWidget):
         self.pp_btn.setEnabled(False)
 
     def pp_runner(self):
-        self.pp_df = preprocess_data(self.mg_df.copy())
+        self.pp_df = preprocess_data(self.mg_df)
 
     def pp_finisher(self):
-        self.add_table(self.pp_df.head(100))
+        self.add_table(self.pp_df)
         self.train_btn.setEnabled(True)
 
     def train_thread(self):
-        worker = Worker(train.train)
+        plots = train.init_plots()
+        self.add_plot(plots['ACC_PLOT'], 'Accuracy Plot')
+        self.add_plot(plots['LOSS_PLOT'], 'Loss Plot')
+        worker = Worker(train.train, render_plots=False)
+        worker.signals.result.connect(self.train_result)
         worker.signals.finished.connect(self.train_finisher)
         self.thread_pool.start(worker)
         self.train_btn.setEnabled(False)
-        self.add_plot(train.ACC_PLOT, 'Accuracy Plot')
-        self.add_plot(train.LOSS_PLOT, 'Loss Plot')
+
+    def train_result(self, result):
+        if result is None:
+            return
+        for for_, paths in result[1].items():
+            for chart, path in paths.items():
+                show_image(train.RESULTS_PLOT[for_][chart], path)
 
     def train_finisher(self):
         for v in train.RESULTS_PLOT:
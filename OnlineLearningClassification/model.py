@@ -1,3 +1,5 @@
+from functools import partial
+
 from tensorflow.python.keras import backend as K
 from tensorflow.python.keras.layers import Dense
 from tensorflow.python.keras.models import Sequential
@@ -7,43 +9,50 @@ from tensorflow.python.keras.regularizers import l2
 from utils import CLASSES
 
 ENCODER_IN_DIM = 91
+ENCODER_UNITS = (128, 64)
+DECODER_UNITS = (64, 128)
+LEARNING_RATE = 0.0001
+SPARSITY_P = 0.01
+SPARSITY_BETA = 3
 
 
-def sparse_regularizer(activation_matrix):
-    p = 0.01
-    beta = 3
+def sparse_regularizer(activation_matrix, p=SPARSITY_P, beta=SPARSITY_BETA):
     p_hat = K.mean(activation_matrix)
     KL_divergence = p * (K.log(p / p_hat)) + (1 - p) * (K.log(1 - p / 1 - p_hat))
     sum = K.sum(KL_divergence)
     return beta * sum
 
 
-def encoder():
+def encoder(units=ENCODER_UNITS):
     print('[INFO] Building Encoder')
     model = Sequential(name='encoder')
-    model.add(Dense(128, input_dim=ENCODER_IN_DIM))
-    model.add(Dense(64))
+    model.add(Dense(units[0], input_dim=ENCODER_IN_DIM))
+    for u in units[1:]:
+        model.add(Dense(u))
     model.add(Dense(len(CLASSES)))
     return model
 
 
-def decoder():
+def decoder(units=DECODER_UNITS, p=SPARSITY_P, beta=SPARSITY_BETA):
     KR = l2(0.001 / 2)
-    AR = sparse_regularizer
+    AR = partial(sparse_regularizer, p=p, beta=beta)
     print('[INFO] Building Decoder')
     model = Sequential(name='decoder')
-    model.add(Dense(64, input_dim=len(CLASSES)))
-    model.add(Dense(128))
+    model.add(Dense(units[0], input_dim=len(CLASSES)))
+    for u in units[1:]:
+        model.add(Dense(u))
     model.add(Dense(len(CLASSES), activation='softmax', kernel_regularizer=KR, activity_regularizer=AR))
     return model
 
 
-def buildDSSAE():
-    enc = encoder()
-    dec = decoder()
+def buildDSSAE(sparse_labels=False, encoder_units=ENCODER_UNITS, decoder_units=DECODER_UNITS,
+               lr=LEARNING_RATE, p=SPARSITY_P, beta=SPARSITY_BETA):
+    enc = encoder(encoder_units)
+    dec = decoder(decoder_units, p, beta)
     print('[INFO] Building Deep Stacked Sparse AutoEncoder')
     model = Sequential([enc, dec], name='DSSAE')
     print('[INFO] Compiling DSSAE Using NADAM Optimizer')
-    opt = Nadam(lr=0.0001)
-    model.compile(optimizer=opt, loss='categorical_crossentropy', metrics=['accuracy'])
+    opt = Nadam(lr=lr)
+    loss = 'sparse_categorical_crossentropy' if sparse_labels else 'categorical_crossentropy'
+    model.compile(optimizer=opt, loss=loss, metrics=['accuracy'])
     return model
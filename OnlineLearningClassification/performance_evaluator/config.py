@@ -2,7 +2,6 @@ import os
 from pathlib import Path
 
 from matplotlib import pyplot as plt
-from matplotlib.font_manager import FontProperties
 
 root_path = os.path.dirname(__file__)
 
@@ -69,9 +68,7 @@ PR_CURVE = dict(
         size=13
     ),
     legend_fontdict=dict(
-        family=FontProperties(
-            fname=os.path.join(root_path, 'fonts/{0}/{0}-{1}.ttf'.format(FONT, FONT_STYLE[FONT][1]))
-        ).get_name(),
+        fname=os.path.join(root_path, 'fonts/{0}/{0}-{1}.ttf'.format(FONT, FONT_STYLE[FONT][1])),
         size=13
     ),
     legend_ncol=1,
@@ -97,9 +94,7 @@ ROC_CURVE = dict(
         size=14
     ),
     legend_fontdict=dict(
-        family=FontProperties(
-            fname=os.path.join(root_path, 'fonts/{0}/{0}-{1}.ttf'.format(FONT, FONT_STYLE[FONT][1]))
-        ).get_name(),
+        fname=os.path.join(root_path, 'fonts/{0}/{0}-{1}.ttf'.format(FONT, FONT_STYLE[FONT][1])),
         size=12
     ),
     legend_ncol=1,
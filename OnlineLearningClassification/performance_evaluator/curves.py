@@ -0,0 +1,51 @@
+import numpy as np
+
+
+def trapezoid(x, y):
+    return np.sum(np.diff(x) * (y[1:] + y[:-1]) / 2)
+
+
+class ClassCurve:
+    def __init__(self, y_true, y_score):
+        order = np.argsort(y_score, kind='mergesort')[::-1]
+        y_score = y_score[order]
+        y_true = y_true[order]
+        threshold_idxs = np.r_[np.where(np.diff(y_score))[0], y_true.size - 1]
+        tps = np.cumsum(y_true, dtype=np.int64)[threshold_idxs]
+        fps = 1 + threshold_idxs - tps
+        self.thresholds = y_score[threshold_idxs]
+        self.tps = tps
+        self.fps = fps
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            precision = tps / (tps + fps)
+            recall = tps / tps[-1]
+            self.precision = np.r_[precision[::-1], 1]
+            self.recall = np.r_[recall[::-1], 0]
+            self.ap = -np.sum(np.diff(self.recall) * self.precision[:-1])
+
+            fpr = np.r_[0, fps] / fps[-1]
+            tpr = np.r_[0, tps] / tps[-1]
+            self.auc = trapezoid(fpr, tpr)
+            keep = np.where(np.r_[True, np.logical_or(np.diff(fps, 2), np.diff(tps, 2)), True])[0]
+            self.fpr = np.r_[0, fps[keep]] / fps[-1]
+            self.tpr = np.r_[0, tps[keep]] / tps[-1]
+
+
+class CurveCache:
+    def __init__(self, actual, probability):
+        actual = np.asarray(actual)
+        probability = np.asarray(probability)
+        self.curves = [ClassCurve(actual == i, probability[:, i]) for i in range(probability.shape[1])]
+
+    def __getitem__(self, i):
+        return self.curves[i]
+
+    def __len__(self):
+        return len(self.curves)
+
+    def ap_scores(self):
+        return np.array([c.ap for c in self.curves])
+
+    def auc_scores(self):
+        return np.array([c.auc for c in self.curves])
@@ -0,0 +1,240 @@
+import numpy as np
+
+from performance_evaluator.metrics import evaluate_counts, kappa_score
+
+WINDOW_SIZE = 1000
+DECAY = 0.001
+COOLDOWN = 100
+WINDOW_METRICS = {
+    'accuracy': 'Accuracy',
+    'recall': 'Sensitivity',
+    'specificity': 'Specificity',
+    'kappa_score': 'Kappa Score',
+    'mcc': 'Mathews Correlation Coefficient',
+}
+
+
+def overall_scores(cm):
+    n = cm.sum()
+    if n == 0:
+        return {'accuracy': np.nan, 'kappa': np.nan, 'mcc': np.nan}
+    t = cm.sum(axis=1)
+    p = cm.sum(axis=0)
+    c = np.trace(cm)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mcc = (c * n - np.dot(t, p)) / np.sqrt((n * n - np.dot(p, p)) * (n * n - np.dot(t, t)))
+        return {'accuracy': c / n, 'kappa': kappa_score(cm), 'mcc': mcc}
+
+
+class SlidingWindowMetrics:
+    def __init__(self, classes, window=WINDOW_SIZE):
+        self.classes = classes
+        self.window = window
+        self.actual = np.zeros(window, dtype=np.int64)
+        self.predicted = np.zeros(window, dtype=np.int64)
+        self.cm = np.zeros((len(classes), len(classes)), dtype=np.int64)
+        self.pos = 0
+        self.count = 0
+
+    def add(self, actual, predicted):
+        if self.count == self.window:
+            self.cm[self.actual[self.pos], self.predicted[self.pos]] -= 1
+        else:
+            self.count += 1
+        self.actual[self.pos] = actual
+        self.predicted[self.pos] = predicted
+        self.cm[actual, predicted] += 1
+        self.pos = (self.pos + 1) % self.window
+
+    def update(self, actual, predicted):
+        for a, p in zip(np.ravel(actual), np.ravel(predicted)):
+            self.add(a, p)
+        return self
+
+    def scores(self):
+        return overall_scores(self.cm)
+
+    def result(self, required_metrics=None):
+        return evaluate_counts(self.cm, None, self.classes, required_metrics or WINDOW_METRICS)
+
+
+class DecayedMetrics:
+    def __init__(self, classes, decay=DECAY):
+        self.classes = classes
+        self.keep = 1 - decay
+        self.cm = np.zeros((len(classes), len(classes)), dtype=float)
+
+    def add(self, actual, predicted):
+        self.cm *= self.keep
+        self.cm[actual, predicted] += 1
+
+    def update(self, actual, predicted):
+        for a, p in zip(np.ravel(actual), np.ravel(predicted)):
+            self.add(a, p)
+        return self
+
+    def scores(self):
+        return overall_scores(self.cm)
+
+    def result(self, required_metrics=None):
+        return evaluate_counts(self.cm, None, self.classes, required_metrics or WINDOW_METRICS)
+
+
+class PageHinkley:
+    def __init__(self, delta=0.005, threshold=50.0, min_samples=30, direction='up'):
+        self.delta = delta
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.direction = direction
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.mean = 0.0
+        self.sum_up = 0.0
+        self.sum_down = 0.0
+        self.min_up = 0.0
+        self.max_down = 0.0
+
+    def add(self, x):
+        self.count += 1
+        self.mean += (x - self.mean) / self.count
+        self.sum_up += x - self.mean - self.delta
+        self.sum_down += x - self.mean + self.delta
+        self.min_up = min(self.min_up, self.sum_up)
+        self.max_down = max(self.max_down, self.sum_down)
+        if self.count < self.min_samples:
+            return False
+        up = self.sum_up - self.min_up > self.threshold
+        down = self.max_down - self.sum_down > self.threshold
+        drift = {'up': up, 'down': down, 'both': up or down}[self.direction]
+        if drift:
+            self.reset()
+        return drift
+
+
+class ADWIN:
+    def __init__(self, delta=0.002, max_buckets=5, min_window=10):
+        self.delta = delta
+        self.max_buckets = max_buckets
+        self.min_window = min_window
+        self.rows = []
+        self.total = 0.0
+        self.variance = 0.0
+        self.width = 0
+
+    @property
+    def mean(self):
+        return self.total / self.width if self.width else 0.0
+
+    def add(self, x):
+        self.insert(x)
+        self.compress()
+        return self.detect()
+
+    def insert(self, x):
+        if self.width:
+            self.variance += self.width * (x - self.mean) ** 2 / (self.width + 1)
+        self.width += 1
+        self.total += x
+        if not self.rows:
+            self.rows.append([])
+        self.rows[0].insert(0, (x, 0.0, 1))
+
+    def compress(self):
+        level = 0
+        while level < len(self.rows) and len(self.rows[level]) > self.max_buckets:
+            (t1, v1, n1), (t2, v2, n2) = self.rows[level].pop(), self.rows[level].pop()
+            m1, m2 = t1 / n1, t2 / n2
+            merged = (t1 + t2, v1 + v2 + n1 * n2 * (m1 - m2) ** 2 / (n1 + n2), n1 + n2)
+            if level + 1 == len(self.rows):
+                self.rows.append([])
+            self.rows[level + 1].insert(0, merged)
+            level += 1
+
+    def drop_oldest(self):
+        t, v, n = self.rows[-1].pop()
+        if not self.rows[-1]:
+            self.rows.pop()
+        rest = self.width - n
+        if rest:
+            self.variance -= v + rest * n * ((self.total - t) / rest - t / n) ** 2 / self.width
+        else:
+            self.variance = 0.0
+        self.width = rest
+        self.total -= t
+
+    def detect(self):
+        drift = False
+        changed = True
+        while changed and self.width > self.min_window:
+            changed = False
+            n0, t0 = 0, 0.0
+            n1, t1 = self.width, self.total
+            variance = self.variance / self.width
+            dd = np.log(2 * np.log(self.width) / self.delta)
+            for row in reversed(self.rows):
+                for t, _, n in reversed(row):
+                    n0 += n
+                    t0 += t
+                    n1 -= n
+                    t1 -= t
+                    if n1 < self.min_window // 2:
+                        break
+                    if n0 < self.min_window // 2:
+                        continue
+                    m = 1.0 / (1.0 / n0 + 1.0 / n1)
+                    eps = np.sqrt(2 * variance * dd / m) + 2 * dd / (3 * m)
+                    if abs(t0 / n0 - t1 / n1) > eps:
+                        while self.width > n1:
+                            self.drop_oldest()
+                        drift = changed = True
+                        break
+                if changed or n1 < self.min_window // 2:
+                    break
+        return drift
+
+
+class DriftMonitor:
+    def __init__(self, classes, window=WINDOW_SIZE, decay=DECAY, error_detector=None, confidence_detector=None,
+                 cooldown=COOLDOWN):
+        self.window = SlidingWindowMetrics(classes, window)
+        self.decayed = DecayedMetrics(classes, decay)
+        self.error_detector = error_detector or PageHinkley(direction='up')
+        self.confidence_detector = confidence_detector or ADWIN()
+        self.cooldown = cooldown
+        self.seen = 0
+        self.alarms = []
+        self.last_alarm = {}
+
+    def add(self, actual, predicted, confidence=None):
+        self.window.add(actual, predicted)
+        self.decayed.add(actual, predicted)
+        self.seen += 1
+        alarms = []
+        if self.error_detector.add(float(actual != predicted)):
+            alarms.append('performance')
+        if confidence is not None and self.confidence_detector.add(float(confidence)):
+            alarms.append('input')
+        alarms = [k for k in alarms if self.seen - self.last_alarm.get(k, -self.cooldown) >= self.cooldown]
+        for kind in alarms:
+            self.last_alarm[kind] = self.seen
+            self.alarms.append((self.seen, kind))
+            print('[WARNING] Drift Detected :: {0} :: Sample :: {1}'.format(kind.title(), self.seen))
+        return alarms
+
+    def update(self, actual, predicted, probability=None):
+        confidence = [None] * len(actual) if probability is None else np.max(probability, axis=1)
+        alarms = []
+        for a, p, c in zip(np.ravel(actual), np.ravel(predicted), confidence):
+            alarms.extend(self.add(a, p, c))
+        return alarms
+
+    def update_epoch(self, epoch_prediction):
+        alarms = []
+        for prediction in epoch_prediction.prediction:
+            alarms.extend(self.update(prediction.actual, prediction.predicted, prediction.probability))
+        return alarms
+
+    def should_retrain(self):
+        return bool(self.alarms)
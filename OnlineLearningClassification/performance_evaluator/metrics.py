@@ -2,8 +2,7 @@ import inspect
 
 import numpy as np
 import pandas as pd
-from sklearn.metrics import average_precision_score, roc_auc_score as ras, cohen_kappa_score
-
+from performance_evaluator.curves import CurveCache
 from performance_evaluator.struct_ import Metric
 
 ROUND = 4
@@ -39,9 +38,8 @@ MOST_REQUIRED = {
 }
 
 
-def fn_exec_kwargs(fn, kwargs):
-    keys = [k for k in inspect.getfullargspec(fn).args if k in kwargs]
-    return fn(**{k: kwargs[k] for k in keys})
+def build_dispatch(metrics):
+    return {m: (globals()[m], tuple(inspect.getfullargspec(globals()[m]).args)) for m in metrics}
 
 
 def format_(metric, name):
@@ -57,10 +55,9 @@ def format_(metric, name):
 
 
 def confusion_matrix(actual, predicted, n_classes):
-    cm = np.zeros((n_classes, n_classes), dtype=int)
-    for i in range(len(actual)):
-        cm[actual[i]][predicted[i]] += 1
-    return cm
+    actual = np.asarray(actual, dtype=np.int64)
+    predicted = np.asarray(predicted, dtype=np.int64)
+    return np.bincount(actual * n_classes + predicted, minlength=n_classes * n_classes).reshape(n_classes, n_classes)
 
 
 def get_tp_fn_fp_tn(cm):
@@ -71,8 +68,11 @@ def get_tp_fn_fp_tn(cm):
     return tp, fn, fp, tn
 
 
-def kappa_score(actual, predicted):
-    return cohen_kappa_score(actual, predicted)
+def kappa_score(cm):
+    n = cm.sum()
+    po = np.trace(cm) / n
+    pe = np.dot(cm.sum(axis=1), cm.sum(axis=0)) / (n * n)
+    return (po - pe) / (1 - pe)
 
 
 def accuracy(tp, fn, fp, tn):
@@ -104,26 +104,12 @@ def f1_score(tp, fn, fp):
     return 2 * ((ppv_ * tpr_) / (ppv_ + tpr_))
 
 
-def __pr_roc_auc_score(actual, probability, f):
-    actual_onehot = np.eye(probability.shape[1])[actual]
-    scores = []
-    for i in range(probability.shape[1]):
-        y_true = actual_onehot[:, i]
-        y_score = probability[:, i]
-        if f == 'pr':
-            score = average_precision_score(y_true, y_score)
-        else:
-            score = ras(y_true, y_score)
-        scores.append(score)
-    return np.array(scores)
-
+def pr_auc_score(curves):
+    return curves.ap_scores()
 
-def pr_auc_score(actual, probability):
-    return __pr_roc_auc_score(actual, probability, f='pr')
 
-
-def roc_auc_score(actual, probability):
-    return __pr_roc_auc_score(actual, probability, f='roc')
+def roc_auc_score(curves):
+    return curves.auc_scores()
 
 
 def npv(tn, fn):
@@ -169,19 +155,39 @@ def mcc(tp, fn, fp, tn):
     return ((tp / n) - (s * p)) / np.sqrt(p * s * (1 - s) * (1 - p))
 
 
-def evaluate(actual, predicted, probability, classes, required_metrics=None):
+DISPATCH = build_dispatch(AVAILABLE_METRICS)
+
+
+def get_dispatch(required_metrics):
+    return DISPATCH if set(required_metrics) <= set(DISPATCH) else build_dispatch(required_metrics)
+
+
+def needs_curves(required_metrics):
+    dispatch = get_dispatch(required_metrics)
+    return any('curves' in dispatch[m][1] for m in required_metrics)
+
+
+def evaluate(actual, predicted, probability, classes, required_metrics=None, curves=None):
     if required_metrics is None:
         required_metrics = MOST_REQUIRED
     cm = confusion_matrix(actual, predicted, len(classes))
+    if curves is None and needs_curves(required_metrics):
+        curves = CurveCache(actual, probability)
+    return evaluate_counts(cm, curves, classes, required_metrics,
+                           actual=actual, predicted=predicted, probability=probability)
+
+
+def evaluate_counts(cm, curves, classes, required_metrics=None, **kwargs):
+    if required_metrics is None:
+        required_metrics = MOST_REQUIRED
+    dispatch = get_dispatch(required_metrics)
     tp, fn, fp, tn = get_tp_fn_fp_tn(cm)
-    kwargs = {
-        'actual': actual, 'predicted': predicted, 'probability': probability,
-        'tp': tp, 'fn': fn, 'fp': fp, 'tn': tn
-    }
+    kwargs.update({'cm': cm, 'curves': curves, 'tp': tp, 'fn': fn, 'fp': fp, 'tn': tn})
     overall_data = {}
     class_data = {}
     for m in required_metrics:
-        metric = fn_exec_kwargs(globals()[m], kwargs)
+        fn_, args = dispatch[m]
+        metric = fn_(*[kwargs[a] for a in args])
         overall, class_ = format_(metric, m)
         overall_data[required_metrics[m]] = [overall]
         class_data[required_metrics[m]] = class_
@@ -193,4 +199,4 @@ def evaluate(actual, predicted, probability, classes, required_metrics=None):
     overall_df.columns = ['Metrics', 'Values']
     class_df = pd.DataFrame.from_dict(class_data)
     class_df.insert(0, 'Class', classes)
-    return Metric(overall_df, class_df)
+    return Metric(overall_df, class_df, curves)
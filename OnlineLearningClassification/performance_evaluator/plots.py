@@ -1,15 +1,9 @@
 import matplotlib.pyplot as plt
-import numpy as np
 import seaborn as sbn
 from matplotlib.ticker import NullFormatter
-from sklearn.metrics import (
-    precision_recall_curve as pr_curve,
-    average_precision_score as ap_score,
-    roc_curve as roc_c,
-    roc_auc_score as roc_auc_s
-)
 
 from performance_evaluator.config import CURRENT_CMAP
+from performance_evaluator.curves import CurveCache
 from performance_evaluator.metrics import confusion_matrix as conf_mat
 
 
@@ -64,22 +58,19 @@ def confusion_matrix(actual, predicted, classes, ax=None, **kwargs):
                        fontdict=kwargs.get('ticklabels_fontdict', CONFIG['ticklabels_fontdict']))
     ax.set_yticklabels(classes, rotation=kwargs.get('yticklabels_rotation', CONFIG['yticklabels_rotation']),
                        fontdict=kwargs.get('ticklabels_fontdict', CONFIG['ticklabels_fontdict']))
-    plt.tight_layout()
+    ax.figure.tight_layout()
     if kwargs.get('show', False):
         plt.show()
 
 
-def precision_recall_curve(actual, probability, classes, ax=None, **kwargs):
+def precision_recall_curve(actual, probability, classes, ax=None, curves=None, **kwargs):
     from performance_evaluator.config import PR_CURVE as CONFIG
     ax = get_ax(ax)
-    actual_onehot = np.eye(probability.shape[1])[actual]
-    for i in range(probability.shape[1]):
-        y_true = actual_onehot[:, i]
-        y_score = probability[:, i]
-        precision, recall, _ = pr_curve(y_true, y_score)
-        ap_score_ = ap_score(y_true, y_score)
+    if curves is None:
+        curves = CurveCache(actual, probability)
+    for i, c in enumerate(curves):
         color = plt.cm.get_cmap(CURRENT_CMAP)(float(i) / len(classes))
-        ax.plot(recall, precision, label='{0} (AP={1})'.format(classes[i], round(ap_score_, 4)),
+        ax.plot(c.recall, c.precision, label='{0} (AP={1})'.format(classes[i], round(c.ap, 4)),
                 color=color)
     ax = set_common(ax, kwargs, CONFIG)
     ax.grid(which='major', alpha=0.7)
@@ -89,22 +80,19 @@ def precision_recall_curve(actual, probability, classes, ax=None, **kwargs):
     ax.tick_params(which='minor', length=0)
     ax.legend(prop=kwargs.get('legend_fontdict', CONFIG['legend_fontdict']),
               ncol=kwargs.get('legend_ncol', CONFIG['legend_ncol']))
-    plt.tight_layout()
+    ax.figure.tight_layout()
     if kwargs.get('show', False):
         plt.show()
 
 
-def roc_curve(actual, probability, classes, ax=None, **kwargs):
+def roc_curve(actual, probability, classes, ax=None, curves=None, **kwargs):
     from performance_evaluator.config import ROC_CURVE as CONFIG
     ax = get_ax(ax)
-    actual_onehot = np.eye(probability.shape[1])[actual]
-    for i in range(probability.shape[1]):
-        y_true = actual_onehot[:, i]
-        y_score = probability[:, i]
-        fpr, tpr, _ = roc_c(y_true, y_score)
-        auc_score = roc_auc_s(y_true, y_score)
+    if curves is None:
+        curves = CurveCache(actual, probability)
+    for i, c in enumerate(curves):
         color = plt.cm.get_cmap(CURRENT_CMAP)(float(i) / len(classes))
-        ax.plot(fpr, tpr, label='{0} (AUC={1})'.format(classes[i], round(auc_score, 4)),
+        ax.plot(c.fpr, c.tpr, label='{0} (AUC={1})'.format(classes[i], round(c.auc, 4)),
                 color=color)
     ax = set_common(ax, kwargs, CONFIG)
     ax.grid(which='major', alpha=0.7)
@@ -114,6 +102,6 @@ def roc_curve(actual, probability, classes, ax=None, **kwargs):
     ax.tick_params(which='minor', length=0)
     ax.legend(prop=kwargs.get('legend_fontdict', CONFIG['legend_fontdict']),
               ncol=kwargs.get('legend_ncol', CONFIG['legend_ncol']))
-    plt.tight_layout()
+    ax.figure.tight_layout()
     if kwargs.get('show', False):
         plt.show()
@@ -0,0 +1,97 @@
+import numpy as np
+
+from performance_evaluator.curves import trapezoid
+from performance_evaluator.metrics import MOST_REQUIRED, confusion_matrix, evaluate_counts, needs_curves
+
+N_BINS = 1000
+
+
+class ConfusionMatrixAccumulator:
+    def __init__(self, n_classes):
+        self.n_classes = n_classes
+        self.cm = np.zeros((n_classes, n_classes), dtype=np.int64)
+
+    def update(self, actual, predicted):
+        self.cm += confusion_matrix(actual, predicted, self.n_classes)
+        return self
+
+    def merge(self, other):
+        self.cm += other.cm
+        return self
+
+    @property
+    def count(self):
+        return int(self.cm.sum())
+
+
+class HistogramCurveAccumulator:
+    def __init__(self, n_classes, n_bins=N_BINS):
+        self.n_classes = n_classes
+        self.n_bins = n_bins
+        self.pos = np.zeros((n_classes, n_bins), dtype=np.int64)
+        self.neg = np.zeros((n_classes, n_bins), dtype=np.int64)
+
+    def update(self, actual, probability):
+        actual = np.asarray(actual)
+        bins = np.clip((np.asarray(probability) * self.n_bins).astype(np.int64), 0, self.n_bins - 1)
+        for i in range(self.n_classes):
+            is_pos = actual == i
+            self.pos[i] += np.bincount(bins[is_pos, i], minlength=self.n_bins)
+            self.neg[i] += np.bincount(bins[~is_pos, i], minlength=self.n_bins)
+        return self
+
+    def merge(self, other):
+        if other.n_bins != self.n_bins:
+            raise ValueError('Cannot Merge Accumulators With {0} And {1} Bins'.format(self.n_bins, other.n_bins))
+        self.pos += other.pos
+        self.neg += other.neg
+        return self
+
+    def cumulative(self, i):
+        return np.cumsum(self.pos[i][::-1]), np.cumsum(self.neg[i][::-1])
+
+    def ap_scores(self):
+        scores = []
+        for i in range(self.n_classes):
+            tps, fps = self.cumulative(i)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                precision = np.where(tps + fps > 0, tps / (tps + fps), 1.0)
+                recall = np.r_[0, tps / tps[-1]]
+            scores.append(np.sum(np.diff(recall) * precision))
+        return np.array(scores)
+
+    def auc_scores(self):
+        scores = []
+        for i in range(self.n_classes):
+            tps, fps = self.cumulative(i)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                scores.append(trapezoid(np.r_[0, fps] / fps[-1], np.r_[0, tps] / tps[-1]))
+        return np.array(scores)
+
+
+class StreamingEvaluator:
+    def __init__(self, classes, n_bins=N_BINS):
+        self.classes = classes
+        self.cm = ConfusionMatrixAccumulator(len(classes))
+        self.curves = HistogramCurveAccumulator(len(classes), n_bins)
+
+    def update(self, actual, predicted, probability=None):
+        self.cm.update(actual, predicted)
+        if probability is not None:
+            self.curves.update(actual, probability)
+        return self
+
+    def merge(self, other):
+        self.cm.merge(other.cm)
+        self.curves.merge(other.curves)
+        return self
+
+    @property
+    def count(self):
+        return self.cm.count
+
+    def result(self, required_metrics=None):
+        if required_metrics is None:
+            required_metrics = MOST_REQUIRED
+        curves = self.curves if needs_curves(required_metrics) else None
+        return evaluate_counts(self.cm.cm, curves, self.classes, required_metrics)
@@ -15,6 +15,7 @@ class EpochPrediction:
 
 
 class Metric:
-    def __init__(self, om, cm):
+    def __init__(self, om, cm, curves=None):
         self.overall_metrics = om
         self.class_metrics = cm
+        self.curves = curves
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from data_cache import file_hash, source_info
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATE_DIR = os.path.join('Data', '.pipeline')
+MAX_WORKERS = 2
+
+
+class Stage:
+    def __init__(self, name, fn, inputs=(), outputs=(), deps=(), params=None, code=()):
+        self.name = name
+        self.fn = fn
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.deps = list(deps)
+        self.params = params or {}
+        self.code = list(code)
+
+
+def fingerprint(path, known=None):
+    if not os.path.exists(path):
+        return {'hash': None}
+    info = source_info(path)
+    if known and all(known.get(k) == v for k, v in info.items()):
+        return known
+    info['hash'] = file_hash(path)
+    return info
+
+
+class Pipeline:
+    def __init__(self, stages, state_dir=STATE_DIR, max_workers=MAX_WORKERS):
+        self.stages = {s.name: s for s in stages}
+        self.state_dir = state_dir
+        self.max_workers = max_workers
+        self.outputs = {}
+
+    def state_path(self, stage):
+        return os.path.join(self.state_dir, '{0}.json'.format(stage.name))
+
+    def read_state(self, stage):
+        path = self.state_path(stage)
+        if not os.path.isfile(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def write_state(self, stage, state):
+        os.makedirs(self.state_dir, exist_ok=True)
+        with open(self.state_path(stage), 'w') as f:
+            json.dump(state, f, indent=4)
+
+    def stage_key(self, stage, known):
+        files = {p: fingerprint(p, known.get(p)) for p in stage.inputs}
+        files.update({c: fingerprint(os.path.join(ROOT, c), known.get(c)) for c in stage.code})
+        payload = json.dumps({
+            'name': stage.name,
+            'params': stage.params,
+            'files': {p: f['hash'] for p, f in files.items()},
+        }, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode()).hexdigest(), files
+
+    def run_stage(self, stage, force=False):
+        t1 = time.perf_counter()
+        state = self.read_state(stage)
+        key, files = self.stage_key(stage, state.get('files', {}))
+        fresh = state.get('key') == key and all(os.path.exists(p) for p in stage.outputs)
+        if fresh and not force:
+            print('[INFO] Stage Up To Date :: {0} :: {1}'.format(stage.name, key[:12]))
+            if files != state.get('files'):
+                self.write_state(stage, {'key': key, 'files': files})
+            status = 'cached'
+        else:
+            print('[INFO] Running Stage :: {0} :: {1}'.format(stage.name, key[:12]))
+            self.outputs[stage.name] = stage.fn(**stage.params)
+            key, files = self.stage_key(stage, files)
+            self.write_state(stage, {'key': key, 'files': files})
+            status = 'ran'
+        return {'name': stage.name, 'status': status, 'key': key, 'seconds': round(time.perf_counter() - t1, 3)}
+
+    def resolve(self, targets=None):
+        needed = []
+
+        def visit(name):
+            if name not in self.stages:
+                raise KeyError('Unknown Stage :: {0}'.format(name))
+            if name in needed:
+                return
+            for d in self.stages[name].deps:
+                visit(d)
+            needed.append(name)
+
+        for name in targets or list(self.stages):
+            visit(name)
+        return needed
+
+    def run(self, targets=None, force=False):
+        pending = self.resolve(targets)
+        results = {}
+        running = {}
+        with ThreadPoolExecutor(self.max_workers) as executor:
+            while pending or running:
+                for name in [n for n in pending if all(d in results for d in self.stages[n].deps)]:
+                    force_ = force is True or (force and name in force)
+                    running[executor.submit(self.run_stage, self.stages[name], force_)] = name
+                    pending.remove(name)
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[running.pop(future)] = future.result()
+        return [results[name] for name in self.resolve(targets)]
+
+
+def merge_stage():
+    from data_handler import load_data, merge_data
+    merge_data(*load_data())
+
+
+def preprocess_stage():
+    from data_cache import read_csv_cached
+    from data_handler import MERGED_PATH, preprocess_data
+    preprocess_data(read_csv_cached(MERGED_PATH))
+
+
+def train_stage(use_tf_data, batch_size, epochs, patience, monitor, lr_schedule):
+    import train
+    train.train(use_tf_data=use_tf_data, batch_size=batch_size, plots=False, evaluate=False, epochs=epochs,
+                patience=patience, monitor=monitor, lr_schedule=lr_schedule, render_plots=False)
+
+
+def evaluate_stage(split, plots):
+    import train
+    return train.evaluate_split(split, plots)
+
+
+def build_pipeline(use_tf_data=False, batch_size=32, plots=True, state_dir=STATE_DIR, max_workers=MAX_WORKERS,
+                   epochs=None, patience=None, monitor=None, lr_schedule=None):
+    from data_handler import ENCODED_COLS, EEG_PATH, MERGED_PATH, PREPROCESSED_PATH, SUBJECT_PATH, VIDEO_PATH
+    from encoder import vocab_path
+    from train import EPOCHS, LR_SCHEDULE, MODEL_DIR, MONITOR, PATIENCE, PREDICTIONS_PATH, SPLITS
+
+    evaluator_code = ['utils.py', 'performance_evaluator/metrics.py', 'performance_evaluator/curves.py']
+    if plots:
+        evaluator_code += ['performance_evaluator/plots.py', 'performance_evaluator/config.py']
+    vocab_paths = [vocab_path(col) for col in ENCODED_COLS]
+    stages = [
+        Stage('merge', merge_stage,
+              inputs=[SUBJECT_PATH, VIDEO_PATH, EEG_PATH], outputs=[MERGED_PATH],
+              code=['data_handler.py']),
+        Stage('preprocess', preprocess_stage, deps=['merge'],
+              inputs=[MERGED_PATH, *vocab_paths], outputs=[PREPROCESSED_PATH, *vocab_paths],
+              code=['data_handler.py', 'encoder.py']),
+        Stage('train', train_stage, deps=['preprocess'],
+              inputs=[PREPROCESSED_PATH], outputs=[os.path.join(MODEL_DIR, 'model.h5'), PREDICTIONS_PATH],
+              params={
+                  'use_tf_data': use_tf_data,
+                  'batch_size': batch_size,
+                  'epochs': epochs or EPOCHS,
+                  'patience': PATIENCE if patience is None else patience,
+                  'monitor': monitor or MONITOR,
+                  'lr_schedule': lr_schedule or LR_SCHEDULE,
+              },
+              code=['train.py', 'model.py', 'callbacks.py', 'affine.py']),
+    ]
+    for split in SPLITS:
+        stages.append(Stage('evaluate_{0}'.format(split.lower()), evaluate_stage, deps=['train'],
+                            inputs=[PREDICTIONS_PATH], outputs=[os.path.join('results', split, 'metrics.csv')],
+                            params={'split': split, 'plots': plots}, code=evaluator_code))
+    return Pipeline(stages, state_dir, max_workers)
@@ -0,0 +1,138 @@
+import sys
+import traceback
+
+import numpy as np
+import pandas as pd
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt, pyqtSlot, QObject, pyqtSignal, QRunnable
+from PyQt5.QtWidgets import QWidget, QVBoxLayout
+from matplotlib.backends.backend_qt import NavigationToolbar2QT
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
+
+TABLE_PAGE_SIZE = 500
+TABLE_CACHE_SIZE = 20000
+
+
+class FigureCanvas(QWidget):
+    def __init__(self, fig):
+        super(QWidget, self).__init__()
+
+        self.lt = QVBoxLayout()
+        self.fig = fig
+        self.fc = FigureCanvasQTAgg(fig)
+        self.lt.addWidget(self.fc)
+        self.tb = NavigationToolbar2QT(self.fc, self)
+        self.lt.addWidget(self.tb)
+        self.setLayout(self.lt)
+
+
+class PandasDfToPyqtTable(QAbstractTableModel):
+    def __init__(self, df, page_size=TABLE_PAGE_SIZE, cache_size=TABLE_CACHE_SIZE):
+        QAbstractTableModel.__init__(self)
+        self._columns = list(df.columns)
+        self._arrays = [df[c].values for c in self._columns]
+        self._n_rows = len(df)
+        self._page_size = page_size
+        self._cache_size = cache_size
+        self._cache = {}
+        self._filter = None
+        self._view = None
+        self._sort = None
+        self._loaded = min(page_size, self._n_rows)
+
+    def _view_size(self):
+        return self._n_rows if self._view is None else len(self._view)
+
+    def _source_row(self, row):
+        return row if self._view is None else int(self._view[row])
+
+    def _update_view(self):
+        self.beginResetModel()
+        idx = self._filter
+        if self._sort is not None:
+            col, order = self._sort
+            values = self._arrays[col] if idx is None else self._arrays[col][idx]
+            try:
+                order_idx = np.argsort(values, kind='mergesort')
+            except TypeError:
+                order_idx = np.argsort(values.astype(str), kind='mergesort')
+            if order == Qt.DescendingOrder:
+                order_idx = order_idx[::-1]
+            idx = order_idx if idx is None else idx[order_idx]
+        self._view = idx
+        self._loaded = min(self._page_size, self._view_size())
+        self.endResetModel()
+
+    def rowCount(self, parent=None):
+        return self._loaded
+
+    def columnCount(self, parent=None):
+        return len(self._columns)
+
+    def canFetchMore(self, parent=None):
+        return self._loaded < self._view_size()
+
+    def fetchMore(self, parent=None):
+        count = min(self._page_size, self._view_size() - self._loaded)
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid():
+            if role == Qt.DisplayRole:
+                key = (self._source_row(index.row()), index.column())
+                text = self._cache.get(key)
+                if text is None:
+                    if len(self._cache) >= self._cache_size:
+                        self._cache.clear()
+                    text = self._cache[key] = str(self._arrays[key[1]][key[0]])
+                return text
+        return None
+
+    def headerData(self, col, orientation, role=None):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self._columns[col]
+        if orientation == Qt.Vertical and role == Qt.DisplayRole:
+            return self._source_row(col)
+        return None
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self._sort = (column, order) if column >= 0 else None
+        self._update_view()
+
+    def set_filter(self, column, text):
+        if text:
+            values = pd.Series(self._arrays[column]).astype(str)
+            self._filter = np.flatnonzero(values.str.contains(text, regex=False).values)
+        else:
+            self._filter = None
+        self._update_view()
+
+
+class WorkerSignals(QObject):
+    finished = pyqtSignal()
+    error = pyqtSignal(tuple)
+    result = pyqtSignal(object)
+
+
+class Worker(QRunnable):
+    def __init__(self, fn, *args, **kwargs):
+        super(Worker, self).__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            print(e)
+            traceback.print_exc()
+            exc_type, value = sys.exc_info()[:2]
+            self.signals.error.emit((exc_type, value, traceback.format_exc()))
+        else:
+            self.signals.result.emit(result)
+        finally:
+            self.signals.finished.emit()
@@ -0,0 +1,235 @@
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from affine import MODEL_PATH, collapse, read_dense_weights, softmax
+
+QUANT_DIR = 'models'
+TARGETS = ['int8', 'float16']
+REFERENCE_TARGET = 'float32'
+FORMS = ['layers', 'affine']
+INT8_MAX = 127
+KAPPA_BUDGET = 0.01
+MCC_BUDGET = 0.01
+MIN_SIZE_RATIO = 1.0
+LATENCY_BUDGET = 1.5
+LATENCY_SAMPLES = 1000
+
+
+def quant_path(target, form, quant_dir=QUANT_DIR):
+    return os.path.join(quant_dir, 'dssae_{0}_{1}.npz'.format(form, target))
+
+
+def quantize_int8(kernel):
+    scale = np.abs(kernel).max(axis=0) / INT8_MAX
+    scale[scale == 0] = 1.0
+    q = np.clip(np.round(kernel / scale), -INT8_MAX, INT8_MAX).astype(np.int8)
+    return q, scale.astype(np.float32)
+
+
+def dequantize_int8(q, scale):
+    return q.astype(np.float32) * scale
+
+
+def quantize_layers(layers, target):
+    arrays = {'target': np.array(target)}
+    for i, (kernel, bias) in enumerate(layers):
+        if target == 'int8':
+            arrays['kernel_{0}'.format(i)], arrays['scale_{0}'.format(i)] = quantize_int8(kernel)
+            arrays['bias_{0}'.format(i)] = bias.astype(np.float32)
+        elif target in ['float16', REFERENCE_TARGET]:
+            arrays['kernel_{0}'.format(i)] = kernel.astype(target)
+            arrays['bias_{0}'.format(i)] = bias.astype(target)
+        else:
+            raise ValueError('Unknown Quantization Target :: {0}'.format(target))
+    return arrays
+
+
+def dequantize_layers(arrays):
+    layers = []
+    i = 0
+    while 'kernel_{0}'.format(i) in arrays:
+        kernel = arrays['kernel_{0}'.format(i)]
+        if 'scale_{0}'.format(i) in arrays:
+            kernel = dequantize_int8(kernel, arrays['scale_{0}'.format(i)])
+        layers.append((kernel.astype(np.float32), arrays['bias_{0}'.format(i)].astype(np.float32)))
+        i += 1
+    return layers
+
+
+class QuantizedPredictor:
+    def __init__(self, layers):
+        self.weight, self.bias = collapse([(k.astype(np.float32), b.astype(np.float32)) for k, b in layers])
+
+    @classmethod
+    def load(cls, path):
+        return cls(dequantize_layers(np.load(path)))
+
+    def predict(self, x):
+        return softmax(np.atleast_2d(np.asarray(x, dtype=np.float32)) @ self.weight + self.bias)
+
+    __call__ = predict
+
+
+def export(target, form, model_path=MODEL_PATH, quant_dir=QUANT_DIR):
+    layers = read_dense_weights(model_path)
+    if form == 'affine':
+        layers = [collapse(layers)]
+    path = quant_path(target, form, quant_dir)
+    np.savez(path, **quantize_layers(layers, target))
+    print('[INFO] Saving {0} {1} Model :: {2}'.format(target, form.title(), path))
+    return path
+
+
+def export_tflite(target, model_path=MODEL_PATH, quant_dir=QUANT_DIR):
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return pool.submit(convert_tflite, target, model_path, quant_dir).result()
+
+
+def convert_tflite(target, model_path=MODEL_PATH, quant_dir=QUANT_DIR):
+    import tensorflow as tf
+    from model import buildDSSAE
+
+    tf.compat.v1.enable_eager_execution()
+    model = buildDSSAE()
+    model.load_weights(model_path)
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if target == 'float16':
+        converter.target_spec.supported_types = [tf.float16]
+    path = os.path.join(quant_dir, 'dssae_{0}.tflite'.format(target))
+    with open(path, 'wb') as f:
+        f.write(converter.convert())
+    print('[INFO] Saving {0} TFLite Model :: {1}'.format(target, path))
+    return path
+
+
+def load_tflite_predictor(path):
+    import tensorflow as tf
+
+    interpreter = tf.lite.Interpreter(model_path=path)
+    inp = interpreter.get_input_details()[0]
+    out = interpreter.get_output_details()[0]
+
+    shape = [None]
+
+    def predict(x):
+        x = np.atleast_2d(np.asarray(x, dtype=np.float32))
+        if shape[0] != x.shape:
+            interpreter.resize_tensor_input(inp['index'], x.shape)
+            interpreter.allocate_tensors()
+            shape[0] = x.shape
+        interpreter.set_tensor(inp['index'], x)
+        interpreter.invoke()
+        return interpreter.get_tensor(out['index'])
+
+    return predict
+
+
+def per_sample_latency(predict, x, samples=LATENCY_SAMPLES):
+    rows = x[:samples]
+    t1 = time.perf_counter()
+    for row in rows:
+        predict(row[None])
+    return (time.perf_counter() - t1) / max(len(rows), 1)
+
+
+def scores(y, prob):
+    from performance_evaluator.metrics import evaluate
+    from utils import CLASSES
+
+    m = evaluate(y, np.argmax(prob, axis=1), prob, CLASSES)
+    return dict(zip(m.overall_metrics['Metrics'], m.overall_metrics['Values'].astype(float)))
+
+
+def artifact_form(name):
+    form = name.split('_')[0]
+    return form if form in FORMS else 'layers'
+
+
+def parity_report(paths, model_path=MODEL_PATH, kappa_budget=KAPPA_BUDGET, mcc_budget=MCC_BUDGET,
+                  min_size_ratio=MIN_SIZE_RATIO, latency_budget=LATENCY_BUDGET, quant_dir=QUANT_DIR):
+    from affine import AffinePredictor
+    from train import get_data, split_data
+
+    x, y = get_data()
+    _, test_x, _, test_y = split_data(x, y)
+    test_x = np.asarray(test_x, dtype=np.float32)
+    test_y = np.asarray(test_y).astype(int)
+
+    reference = AffinePredictor.from_layers(read_dense_weights(model_path))
+    ref_prob = reference.predict(test_x)
+    ref_scores = scores(test_y, ref_prob)
+    ref_paths = {f: export(REFERENCE_TARGET, f, model_path, quant_dir) for f in FORMS}
+    report = {
+        'reference': {
+            'path': model_path,
+            'float32_bytes': {f: os.path.getsize(p) for f, p in ref_paths.items()},
+            'latency_us': round(per_sample_latency(reference.predict, test_x) * 1e6, 3),
+            'kappa': ref_scores['Kappa Score'],
+            'mcc': ref_scores['Mathews Correlation Coefficient'],
+        },
+        'quantized': {},
+    }
+    print('[INFO] Reference :: {0}'.format(json.dumps(report['reference'])))
+    for name, path in paths.items():
+        if path.endswith('.tflite'):
+            predict = load_tflite_predictor(path)
+        else:
+            predict = QuantizedPredictor.load(path).predict
+        prob = predict(test_x)
+        q_scores = scores(test_y, prob)
+        entry = {
+            'path': path,
+            'bytes': os.path.getsize(path),
+            'latency_us': round(per_sample_latency(predict, test_x) * 1e6, 3),
+            'max_abs_diff': float(np.max(np.abs(prob - ref_prob))),
+            'agreement': float(np.mean(np.argmax(prob, axis=1) == np.argmax(ref_prob, axis=1))),
+            'kappa': q_scores['Kappa Score'],
+            'mcc': q_scores['Mathews Correlation Coefficient'],
+        }
+        for k in ['kappa', 'mcc']:
+            drop = np.nan_to_num(report['reference'][k]) - np.nan_to_num(entry[k])
+            entry['{0}_drop'.format(k)] = round(float(drop), 4)
+        entry['size_ratio'] = round(report['reference']['float32_bytes'][artifact_form(name)] / entry['bytes'], 2)
+        entry['latency_ratio'] = round(entry['latency_us'] / max(report['reference']['latency_us'], 1e-9), 2)
+        entry['ok'] = (entry['kappa_drop'] <= kappa_budget and entry['mcc_drop'] <= mcc_budget and
+                       entry['size_ratio'] >= min_size_ratio and entry['latency_ratio'] <= latency_budget)
+        report['quantized'][name] = entry
+        print('[INFO] {0} :: {1}'.format(name, json.dumps(entry)))
+    report['ok'] = all(e['ok'] for e in report['quantized'].values())
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--targets', nargs='+', choices=TARGETS, default=TARGETS)
+    parser.add_argument('--forms', nargs='+', choices=FORMS, default=FORMS)
+    parser.add_argument('--tflite', action='store_true')
+    parser.add_argument('--kappa-budget', type=float, default=KAPPA_BUDGET)
+    parser.add_argument('--mcc-budget', type=float, default=MCC_BUDGET)
+    parser.add_argument('--min-size-ratio', type=float, default=MIN_SIZE_RATIO)
+    parser.add_argument('--latency-budget', type=float, default=LATENCY_BUDGET)
+    parser.add_argument('--report', default=os.path.join(QUANT_DIR, 'quantization_report.json'))
+    args = parser.parse_args()
+
+    paths_ = {}
+    for t in args.targets:
+        for f_ in args.forms:
+            paths_['{0}_{1}'.format(f_, t)] = export(t, f_, args.model)
+        if args.tflite:
+            paths_['tflite_{0}'.format(t)] = export_tflite(t, args.model)
+    report_ = parity_report(paths_, args.model, args.kappa_budget, args.mcc_budget, args.min_size_ratio,
+                            args.latency_budget)
+    with open(args.report, 'w') as f:
+        json.dump(report_, f, indent=4)
+    print('[INFO] Saving Quantization Report :: {0}'.format(args.report))
+    if not report_['ok']:
+        print('[WARNING] Quantized Model Exceeds Kappa/MCC, Size Or Latency Budget')
+        raise SystemExit(1)
@@ -1,5 +1,4 @@
-def reset_random():
-    seed = 1
+def reset_random(seed=1):
     import os
     os.environ['PYTHONHASHSEED'] = str(seed)
     import random
@@ -13,7 +12,9 @@ def reset_random():
     os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
     os.environ['CUDA_VISIBLE_DEVICES'] = '0'
     os.environ['PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION'] = 'python'
-    import tensorflow as tf
-    tf.compat.v1.random.set_random_seed(seed)
-    tf.compat.v1.set_random_seed(seed)
-    tf.compat.v1.disable_eager_execution()
+    import sys
+    if 'tensorflow' in sys.modules:
+        import tensorflow as tf
+        tf.compat.v1.random.set_random_seed(seed)
+        tf.compat.v1.set_random_seed(seed)
+        tf.compat.v1.disable_eager_execution()
@@ -0,0 +1,186 @@
+if True:
+    from reset_random import reset_random
+
+    reset_random()
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from affine import AFFINE_PATH, load_affine_predictor
+from encoder import CategoricalEncoder
+from utils import CLASSES
+
+MODEL_PATH = 'models/model.h5'
+SCHEMA_PATH = 'Data/preprocessed.csv'
+HOST = '127.0.0.1'
+PORT = 8000
+MAX_BATCH_SIZE = 256
+MAX_WAIT = 0.005
+
+
+def load_feature_cols(schema_path=SCHEMA_PATH):
+    return list(pd.read_csv(schema_path, nrows=0).columns)[:-1]
+
+
+def load_keras_predictor(model_path=MODEL_PATH):
+    from model import buildDSSAE
+    reset_random()
+    model = buildDSSAE()
+    print('[INFO] Loading Model :: {0}'.format(model_path))
+    model.load_weights(model_path)
+    return model.predict
+
+
+class MicroBatcher:
+    def __init__(self, load_predictor, max_batch_size=MAX_BATCH_SIZE, max_wait=MAX_WAIT):
+        self.load_predictor = load_predictor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.queue = queue.Queue()
+        self.ready = Future()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        self.ready.result()
+
+    def submit(self, x):
+        future = Future()
+        self.queue.put((x, future))
+        return future
+
+    def predict(self, x):
+        return self.submit(x).result()
+
+    def next_batch(self):
+        batch = [self.queue.get()]
+        size = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def run(self):
+        try:
+            predict_fn = self.load_predictor()
+        except Exception as e:
+            self.ready.set_exception(e)
+            return
+        self.ready.set_result(True)
+        while True:
+            batch = self.next_batch()
+            try:
+                prob = predict_fn(np.concatenate([x for x, _ in batch]))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            start = 0
+            for x, future in batch:
+                future.set_result(prob[start:start + len(x)])
+                start += len(x)
+
+
+class InferenceService:
+    def __init__(self, load_predictor=load_keras_predictor, schema_path=SCHEMA_PATH,
+                 max_batch_size=MAX_BATCH_SIZE, max_wait=MAX_WAIT):
+        self.feature_cols = load_feature_cols(schema_path)
+        self.encoder = CategoricalEncoder(os.path.dirname(schema_path)).load(self.feature_cols)
+        self.batcher = MicroBatcher(load_predictor, max_batch_size, max_wait)
+
+    def encode(self, rows):
+        df = pd.DataFrame(rows)
+        missing = [c for c in self.feature_cols if c not in df.columns]
+        if missing:
+            raise ValueError('Missing Columns :: {0}'.format(missing))
+        df = self.encoder.transform(df[self.feature_cols])
+        return df.values.astype(np.float32)
+
+    def predict(self, rows):
+        prob = self.batcher.predict(self.encode(rows))
+        pred = np.argmax(prob, axis=1)
+        return {
+            'probability': prob.tolist(),
+            'predicted': pred.tolist(),
+            'classes': [CLASSES[p] for p in pred],
+        }
+
+
+class InferenceHandler(BaseHTTPRequestHandler):
+    service = None
+
+    def send_json(self, code, body):
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self.send_json(200, {'status': 'ok', 'features': len(self.service.feature_cols)})
+        else:
+            self.send_json(404, {'error': 'Not Found'})
+
+    def do_POST(self):
+        if self.path != '/predict':
+            self.send_json(404, {'error': 'Not Found'})
+            return
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            rows = body['rows'] if isinstance(body, dict) else body
+            self.send_json(200, self.service.predict(rows))
+        except (ValueError, KeyError, TypeError) as e:
+            self.send_json(400, {'error': str(e)})
+        except Exception as e:
+            traceback.print_exc()
+            self.send_json(500, {'error': '{0}: {1}'.format(type(e).__name__, e)})
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+def serve(host=HOST, port=PORT, service=None):
+    InferenceHandler.service = service or InferenceService()
+    server = ThreadingHTTPServer((host, port), InferenceHandler)
+    print('[INFO] Serving DSSAE Predictions On :: http://{0}:{1}/predict'.format(host, port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--max-batch-size', type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument('--max-wait', type=float, default=MAX_WAIT)
+    parser.add_argument('--engine', choices=['keras', 'affine'], default='keras')
+    parser.add_argument('--affine-path', default=AFFINE_PATH)
+    args = parser.parse_args()
+    if args.engine == 'affine':
+        load_predictor = partial(load_affine_predictor, args.affine_path)
+    else:
+        load_predictor = load_keras_predictor
+    serve(args.host, args.port, InferenceService(load_predictor=load_predictor, max_batch_size=args.max_batch_size,
+                                                 max_wait=args.max_wait))
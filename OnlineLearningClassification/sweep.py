@@ -0,0 +1,148 @@
+import argparse
+import itertools
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import StratifiedKFold
+
+PARAM_GRID = {
+    'encoder_units': [(128, 64), (256, 128), (64, 32)],
+    'decoder_units': [(64, 128), (128, 256), (32, 64)],
+    'lr': [0.0001, 0.0005, 0.001],
+    'p': [0.01, 0.05],
+    'beta': [1, 3],
+}
+N_SPLITS = 5
+SWEEP_EPOCHS = 10
+BATCH_SIZE = 32
+THREADS_PER_WORKER = 1
+RESULTS_DIR = 'results/sweep'
+DATA_PATH = 'Data/preprocessed.csv'
+SEED = 1
+THREAD_VARS = ['OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'TF_NUM_INTRAOP_THREADS',
+               'TF_NUM_INTEROP_THREADS']
+
+_DATA = {}
+
+
+def grid_trials(grid=PARAM_GRID):
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*[grid[k] for k in keys])]
+
+
+def random_trials(n_trials, grid=PARAM_GRID, seed=1):
+    trials = grid_trials(grid)
+    random.Random(seed).shuffle(trials)
+    return trials[:n_trials]
+
+
+def set_thread_env(threads):
+    saved = {var: os.environ.get(var) for var in THREAD_VARS}
+    os.environ.update({var: str(threads) for var in THREAD_VARS})
+    return saved
+
+
+def restore_env(saved):
+    for var, value in saved.items():
+        if value is None:
+            os.environ.pop(var, None)
+        else:
+            os.environ[var] = value
+
+
+def init_worker(threads, data_path):
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(threads)
+    from reset_random import reset_random
+    reset_random()
+
+    from train import get_data
+    _DATA['x'], _DATA['y'] = get_data(data_path)
+
+
+def run_fold(trial_id, params, fold, train_idx, test_idx, epochs, batch_size):
+    from tensorflow.python.keras import backend as K
+
+    from model import buildDSSAE
+    from performance_evaluator.metrics import evaluate
+    from reset_random import reset_random
+    from utils import CLASSES
+
+    K.clear_session()
+    reset_random(SEED + fold)
+    x, y = _DATA['x'], _DATA['y']
+    model = buildDSSAE(sparse_labels=True, **params)
+    t1 = time.time()
+    model.fit(x[train_idx], y[train_idx], epochs=epochs, batch_size=batch_size, verbose=0)
+    fit_time = time.time() - t1
+    prob = model.predict(x[test_idx])
+    pred = np.argmax(prob, axis=1).ravel().astype(int)
+    m = evaluate(y[test_idx], pred, prob, CLASSES)
+    row = {'Trial': trial_id, 'Fold': fold}
+    row.update({k: str(v) for k, v in params.items()})
+    row.update({k: float(v) for k, v in m.overall_metrics.values})
+    row['Fit Time'] = round(fit_time, 2)
+    return row
+
+
+def sweep(trials, n_splits=N_SPLITS, epochs=SWEEP_EPOCHS, batch_size=BATCH_SIZE, workers=None,
+          threads=THREADS_PER_WORKER, data_path=DATA_PATH, results_dir=RESULTS_DIR):
+    from data_cache import read_csv_cached
+    from utils import print_df_to_table
+
+    y = read_csv_cached(data_path).iloc[:, -1].to_numpy().astype(int)
+    folds = list(StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=1).split(np.zeros(len(y)), y))
+    workers = workers or max((os.cpu_count() or 1) // threads, 1)
+    print('[INFO] Sweep :: {0} Trials x {1} Folds On {2} Workers x {3} Threads'.format(
+        len(trials), n_splits, workers, threads))
+
+    rows = []
+    t1 = time.time()
+    ctx = multiprocessing.get_context('spawn')
+    saved = set_thread_env(threads)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                 initializer=init_worker, initargs=(threads, data_path)) as pool:
+            futures = [
+                pool.submit(run_fold, t, params, f, train_idx, test_idx, epochs, batch_size)
+                for t, params in enumerate(trials) for f, (train_idx, test_idx) in enumerate(folds)
+            ]
+            for future in as_completed(futures):
+                row = future.result()
+                rows.append(row)
+                print('[INFO] Trial :: {0} | Fold :: {1} | Accuracy :: {2:.4f} | Kappa Score :: {3:.4f}'.format(
+                    row['Trial'], row['Fold'], row['Accuracy'], row['Kappa Score']))
+    finally:
+        restore_env(saved)
+    print('[INFO] Sweep Time :: {0} secs'.format(int(time.time() - t1)))
+
+    os.makedirs(results_dir, exist_ok=True)
+    df = pd.DataFrame(rows).sort_values(['Trial', 'Fold']).reset_index(drop=True)
+    df.to_csv(os.path.join(results_dir, 'folds.csv'), index=False)
+    param_cols = list(trials[0])
+    metric_cols = [c for c in df.columns if c not in ['Trial', 'Fold'] + param_cols]
+    summary = df.groupby(['Trial'] + param_cols, sort=False)[metric_cols].agg(['mean', 'std'])
+    summary.columns = ['{0} {1}'.format(m, s.title()) for m, s in summary.columns]
+    summary = summary.reset_index().sort_values('Kappa Score Mean', ascending=False).round(4)
+    summary.to_csv(os.path.join(results_dir, 'summary.csv'), index=False)
+    print_df_to_table(summary[['Trial'] + param_cols + ['Accuracy Mean', 'Kappa Score Mean', 'Kappa Score Std']])
+    return summary
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--search', choices=['grid', 'random'], default='random')
+    parser.add_argument('--trials', type=int, default=10)
+    parser.add_argument('--folds', type=int, default=N_SPLITS)
+    parser.add_argument('--epochs', type=int, default=SWEEP_EPOCHS)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--threads', type=int, default=THREADS_PER_WORKER)
+    args = parser.parse_args()
+    sweep(grid_trials() if args.search == 'grid' else random_trials(args.trials),
+          args.folds, args.epochs, workers=args.workers, threads=args.threads)
@@ -2,61 +2,204 @@ if True:
     from reset_random import reset_random
 
     reset_random()
+import json
 import os
 import shutil
+import sys
+import threading
 import time
 
-import matplotlib
 import numpy as np
 import pandas as pd
-from matplotlib import pyplot as plt
-from model import buildDSSAE
-from sklearn.model_selection import train_test_split
-from tensorflow.python.keras.callbacks import ModelCheckpoint
-from tensorflow.python.keras.utils.np_utils import to_categorical
-from utils import CLASSES, plot, TrainingCallback
-
-matplotlib.use('Qt5Agg')
-matplotlib.style.use('seaborn-darkgrid')
-plt.rcParams['font.family'] = 'JetBrains Mono'
-
-ACC_PLOT = plt.figure(num=2)
-LOSS_PLOT = plt.figure(num=3)
-RESULTS_PLOT = {
-    'Train': {
-        'CONF_MAT': plt.figure(num=4),
-        'PR_CURVE': plt.figure(num=5),
-        'ROC_CURVE': plt.figure(num=6),
-    },
-    'Test': {
-        'CONF_MAT': plt.figure(num=7),
-        'PR_CURVE': plt.figure(num=8),
-        'ROC_CURVE': plt.figure(num=9),
-    }
-}
+from data_cache import read_csv_cached
+from utils import MONITOR_MODES, plot_splits, render_telemetry, setup_matplotlib
+
+MODEL_DIR = 'models'
+ONLINE_EPOCHS = 5
+REPLAY_SIZE = 10000
+BATCH_SIZE = 32
+SHUFFLE_BUFFER = 10000
+TEST_SIZE = 0.3
+EPOCHS = 50
+PATIENCE = 5
+MONITOR = 'val_loss'
+LR_SCHEDULE = 'plateau'
+LABEL_DTYPE = np.int8
+PREDICTIONS_PATH = os.path.join(MODEL_DIR, 'predictions.npz')
+SUMMARY_PATH = os.path.join(MODEL_DIR, 'training_summary.json')
+SPLITS = ['Train', 'Test']
+BACKEND = 'Qt5Agg'
+PLOTS = {}
+PLOTS_LOCK = threading.Lock()
+
+
+def init_plots():
+    with PLOTS_LOCK:
+        if not PLOTS:
+            from matplotlib import pyplot as plt
+
+            setup_matplotlib(BACKEND)
+
+            PLOTS['ACC_PLOT'] = plt.figure(num=2)
+            PLOTS['LOSS_PLOT'] = plt.figure(num=3)
+            PLOTS['RESULTS_PLOT'] = {
+                'Train': {
+                    'CONF_MAT': plt.figure(num=4),
+                    'PR_CURVE': plt.figure(num=5),
+                    'ROC_CURVE': plt.figure(num=6),
+                },
+                'Test': {
+                    'CONF_MAT': plt.figure(num=7),
+                    'PR_CURVE': plt.figure(num=8),
+                    'ROC_CURVE': plt.figure(num=9),
+                }
+            }
+    return PLOTS
+
 
+def __getattr__(name):
+    if name in ('ACC_PLOT', 'LOSS_PLOT', 'RESULTS_PLOT'):
+        return init_plots()[name]
+    raise AttributeError('module {0!r} has no attribute {1!r}'.format(__name__, name))
 
-def get_data():
-    dp = 'Data/preprocessed.csv'
-    df = pd.read_csv(dp)
-    x_, y_ = df.values[:, :-1], df.values[:, -1]
+
+def get_data(dp='Data/preprocessed.csv'):
+    df = read_csv_cached(dp)
+    x_ = df.iloc[:, :-1].to_numpy(dtype=np.float32)
+    y_ = df.iloc[:, -1].to_numpy().astype(LABEL_DTYPE)
     return x_, y_
 
 
-def train():
+def split_data(x, y, test_size=TEST_SIZE):
+    from sklearn.model_selection import train_test_split
+    return train_test_split(x, y, test_size=test_size, shuffle=True, random_state=1)
+
+
+def make_dataset(x, y, batch_size=BATCH_SIZE, shuffle_buffer=SHUFFLE_BUFFER, shuffle=True):
+    import tensorflow as tf
+
+    n_features = x.shape[1]
+
+    def gather(idx):
+        idx = np.sort(idx)
+        return x[idx].astype(np.float32), y[idx].astype(np.int32)
+
+    def load_batch(idx):
+        bx, by = tf.numpy_function(gather, [idx], [tf.float32, tf.int32])
+        bx.set_shape([None, n_features])
+        by.set_shape([None])
+        return bx, by
+
+    ds = tf.data.Dataset.range(len(x))
+    if shuffle:
+        ds = ds.shuffle(shuffle_buffer, seed=1, reshuffle_each_iteration=True)
+    ds = ds.batch(batch_size).map(load_batch, num_parallel_calls=tf.data.experimental.AUTOTUNE)
+    steps = int(np.ceil(len(x) / batch_size))
+    return ds.repeat().prefetch(tf.data.experimental.AUTOTUNE), steps
+
+
+def update_replay_buffer(replay_x, replay_y, new_x, new_y, seen, size=REPLAY_SIZE):
+    fill = max(min(size - len(replay_x), len(new_x)), 0)
+    replay_x = np.concatenate([replay_x, new_x[:fill]])
+    replay_y = np.concatenate([replay_y, new_y[:fill]])
+    rest_x, rest_y = new_x[fill:], new_y[fill:]
+    if len(rest_x):
+        rng = np.random.default_rng(seen)
+        slots = rng.integers(0, seen + fill + np.arange(len(rest_x)) + 1)
+        keep = slots < size
+        replay_x[slots[keep]] = rest_x[keep]
+        replay_y[slots[keep]] = rest_y[keep]
+    return replay_x, replay_y
+
+
+def save_online_state(x, y, replay_x, replay_y, seen, model_dir=MODEL_DIR):
+    replay_x, replay_y = update_replay_buffer(replay_x, replay_y, np.asarray(x[seen:]), np.asarray(y[seen:]), seen)
+    np.savez(os.path.join(model_dir, 'replay.npz'), x=replay_x, y=replay_y)
+    with open(os.path.join(model_dir, 'online_state.json'), 'w') as f:
+        json.dump({'rows_seen': len(x), 'replay_size': len(replay_x)}, f, indent=4)
+    print('[INFO] Rows Seen :: {0} | Replay Buffer :: {1}'.format(len(x), len(replay_x)))
+
+
+def load_online_state(model_dir=MODEL_DIR):
+    state_path = os.path.join(model_dir, 'online_state.json')
+    replay_path = os.path.join(model_dir, 'replay.npz')
+    if not os.path.isfile(state_path) or not os.path.isfile(replay_path):
+        return None
+    with open(state_path) as f:
+        state = json.load(f)
+    replay = np.load(replay_path)
+    return state['rows_seen'], replay['x'], replay['y']
+
+
+def training_summary(history, monitor, start, epochs, seconds, summary_path=SUMMARY_PATH):
+    values = history.history.get(monitor, [])
+    best = int(np.nanargmin(values) if MONITOR_MODES[monitor] == 'min' else np.nanargmax(values)) if values else -1
+    run = len(history.epoch)
+    per_epoch = seconds / max(run, 1)
+    summary = {
+        'monitor': monitor,
+        'max_epochs': epochs - start,
+        'epochs_run': run,
+        'stopped_early': start + run < epochs,
+        'best_epoch': start + best + 1,
+        'best_{0}'.format(monitor): round(float(values[best]), 4) if values else None,
+        'final_lr': round(float(history.history['lr'][-1]), 8) if 'lr' in history.history else None,
+        'seconds': round(seconds, 3),
+        'seconds_per_epoch': round(per_epoch, 3),
+        'est_seconds_saved': round(per_epoch * (epochs - start - run), 3),
+    }
+    with open(summary_path, 'w') as f:
+        json.dump(summary, f, indent=4)
+    print('[INFO] Epochs Run :: {0}/{1} | Best Epoch :: {2} | Est. Time Saved :: {3} secs'.format(
+        run, summary['max_epochs'], summary['best_epoch'], summary['est_seconds_saved']))
+    return summary
+
+
+def read_training_summary(summary_path=SUMMARY_PATH):
+    if not os.path.isfile(summary_path):
+        return {}
+    with open(summary_path) as f:
+        return json.load(f)
+
+
+def save_predictions(model, train_x, train_y, test_x, test_y, predictions_path=PREDICTIONS_PATH):
+    print('[INFO] Saving Predictions :: {0}'.format(predictions_path))
+    np.savez(predictions_path, train_y=train_y.astype(int), train_prob=model.predict(train_x),
+             test_y=test_y.astype(int), test_prob=model.predict(test_x))
+
+
+def load_split(split, predictions_path=PREDICTIONS_PATH):
+    data = np.load(predictions_path)
+    y, prob = data['{0}_y'.format(split.lower())], data['{0}_prob'.format(split.lower())]
+    pred = np.argmax(prob, axis=1).ravel().astype(int)
+    return y, pred, prob, os.path.join('results', split)
+
+
+def evaluate_model(plots=True, predictions_path=PREDICTIONS_PATH, splits=SPLITS):
+    jobs = {split: load_split(split, predictions_path) for split in splits}
+    return plot_splits(jobs, charts=plots)
+
+
+def evaluate_split(split, plots=True, predictions_path=PREDICTIONS_PATH):
+    return evaluate_model(plots, predictions_path, [split])[0][split]
+
+
+def train(use_tf_data=False, batch_size=BATCH_SIZE, shuffle_buffer=SHUFFLE_BUFFER, plots=True, evaluate=True,
+          epochs=EPOCHS, patience=PATIENCE, monitor=MONITOR, lr_schedule=LR_SCHEDULE, render_plots=False):
+    from callbacks import TrainingCallback, fit_callbacks
+    from model import buildDSSAE
+
     reset_random()
 
     x, y = get_data()
 
-    y_cat = to_categorical(y, len(CLASSES))
     print('[INFO] Splitting Data Into Training|Testing')
-    train_x, test_x, train_y, test_y = train_test_split(x, y, test_size=0.3, shuffle=True, random_state=1)
-    test_y_cat = to_categorical(test_y, len(CLASSES))
+    train_x, test_x, train_y, test_y = split_data(x, y)
     print('[INFO] X Shape :: {0}'.format(x.shape))
     print('[INFO] Train X Shape :: {0}'.format(train_x.shape))
     print('[INFO] Test X Shape :: {0}'.format(test_x.shape))
 
-    model_dir = 'models'
+    model_dir = MODEL_DIR
     if os.path.isdir(model_dir):
         shutil.rmtree(model_dir)
     os.makedirs(model_dir, exist_ok=True)
@@ -64,36 +207,107 @@ def train():
     acc_loss_csv_path = os.path.join(model_dir, 'acc_loss.csv')
     model_path = os.path.join(model_dir, 'model.h5')
 
-    training_cb = TrainingCallback(acc_loss_csv_path, ACC_PLOT, LOSS_PLOT)
-    checkpoint = ModelCheckpoint(model_path, save_best_only=True, save_weights_only=True,
-                                 monitor='val_accuracy', mode='max', verbose=False)
+    figs = init_plots() if plots else {'ACC_PLOT': None, 'LOSS_PLOT': None}
+    training_cb = TrainingCallback(acc_loss_csv_path, figs['ACC_PLOT'], figs['LOSS_PLOT'], render=render_plots)
 
-    model = buildDSSAE()
+    model = buildDSSAE(sparse_labels=True)
 
     initial_epoch = 0
     if os.path.isfile(model_path) and os.path.isfile(acc_loss_csv_path):
         print('[INFO] Loading Pre-Trained Model :: {0}'.format(model_path))
         model.load_weights(model_path)
         initial_epoch = len(pd.read_csv(acc_loss_csv_path))
+    cbs = [training_cb] + fit_callbacks(model_path, monitor, patience, lr_schedule, initial_epoch, epochs,
+                                        test_x, test_y)
+    print('[INFO] Max Epochs :: {0} | Monitor :: {1} | Patience :: {2} | LR Schedule :: {3}'.format(
+        epochs, monitor, patience, lr_schedule))
 
     t1 = time.time()
     print('[INFO] Fitting Data')
-    model.fit(x, y_cat,
-              validation_data=(test_x, test_y_cat), epochs=50,
-              verbose=0, initial_epoch=initial_epoch, callbacks=[training_cb, checkpoint])
+    if use_tf_data:
+        print('[INFO] Using tf.data Pipeline :: Batch Size :: {0} | Shuffle Buffer :: {1}'.format(
+            batch_size, shuffle_buffer))
+        train_ds, steps = make_dataset(train_x, train_y, batch_size, shuffle_buffer)
+        test_ds, val_steps = make_dataset(test_x, test_y, batch_size, shuffle=False)
+        history = model.fit(train_ds, steps_per_epoch=steps,
+                            validation_data=test_ds, validation_steps=val_steps, epochs=epochs,
+                            verbose=0, initial_epoch=initial_epoch, callbacks=cbs)
+    else:
+        history = model.fit(train_x, train_y, validation_data=(test_x, test_y), epochs=epochs,
+                            verbose=0, initial_epoch=initial_epoch, callbacks=cbs)
     t2 = time.time()
     print('[INFO] Computational Time :: {0} secs'.format(int(t2 - t1)))
+    training_summary(history, monitor, initial_epoch, epochs, t2 - t1, os.path.join(model_dir, 'training_summary.json'))
+
+    model.load_weights(model_path)
+    save_online_state(x, y, x[:0], y[:0], 0, model_dir)
+    save_predictions(model, train_x, train_y, test_x, test_y, os.path.join(model_dir, 'predictions.npz'))
+
+    if evaluate:
+        return evaluate_model(plots, os.path.join(model_dir, 'predictions.npz'))
+
+
+def train_incremental(plots=True, evaluate=True, epochs=ONLINE_EPOCHS, patience=PATIENCE, monitor=MONITOR,
+                      lr_schedule=LR_SCHEDULE, render_plots=False):
+    from callbacks import TrainingCallback, fit_callbacks
+    from model import buildDSSAE
+
+    reset_random()
+
+    model_dir = MODEL_DIR
+    acc_loss_csv_path = os.path.join(model_dir, 'acc_loss.csv')
+    model_path = os.path.join(model_dir, 'model.h5')
+    state = load_online_state(model_dir)
+    if state is None or not os.path.isfile(model_path) or not os.path.isfile(acc_loss_csv_path):
+        print('[INFO] No Online State Found In :: {0} :: Running Full Training'.format(model_dir))
+        return train(plots=plots, evaluate=evaluate, patience=patience, monitor=monitor, lr_schedule=lr_schedule,
+                     render_plots=render_plots)
+    seen, replay_x, replay_y = state
+
+    x, y = get_data()
+    new_x, new_y = np.asarray(x[seen:]), np.asarray(y[seen:])
+    print('[INFO] Rows Seen :: {0} | New Rows :: {1} | Replay Buffer :: {2}'.format(seen, len(new_x), len(replay_x)))
+    if len(new_x) < 2:
+        print('[INFO] Not Enough New Data To Update The Model')
+        return None
+
+    print('[INFO] Splitting New Data Into Training|Testing')
+    train_x, test_x, train_y, test_y = split_data(new_x, new_y)
+    fit_x = np.concatenate([train_x, replay_x])
+    fit_y = np.concatenate([train_y, replay_y])
+    print('[INFO] Fit X Shape :: {0}'.format(fit_x.shape))
+    print('[INFO] Test X Shape :: {0}'.format(test_x.shape))
+
+    figs = init_plots() if plots else {'ACC_PLOT': None, 'LOSS_PLOT': None}
+    training_cb = TrainingCallback(acc_loss_csv_path, figs['ACC_PLOT'], figs['LOSS_PLOT'], render=render_plots)
 
+    model = buildDSSAE(sparse_labels=True)
+    print('[INFO] Loading Pre-Trained Model :: {0}'.format(model_path))
     model.load_weights(model_path)
+    initial_epoch = len(pd.read_csv(acc_loss_csv_path))
+    cbs = [training_cb] + fit_callbacks(model_path, monitor, patience, lr_schedule, initial_epoch,
+                                        initial_epoch + epochs, test_x, test_y)
 
-    train_prob = model.predict(train_x)
-    train_pred = np.argmax(train_prob, axis=1).ravel().astype(int)
-    plot(train_y.astype(int), train_pred, train_prob, RESULTS_PLOT, 'results/Train')
+    t1 = time.time()
+    print('[INFO] Fine-Tuning On New Data')
+    history = model.fit(fit_x, fit_y, validation_data=(test_x, test_y),
+                        epochs=initial_epoch + epochs, verbose=0, initial_epoch=initial_epoch, callbacks=cbs)
+    t2 = time.time()
+    print('[INFO] Computational Time :: {0} secs'.format(int(t2 - t1)))
+    training_summary(history, monitor, initial_epoch, initial_epoch + epochs, t2 - t1,
+                     os.path.join(model_dir, 'training_summary.json'))
+
+    model.load_weights(model_path)
+    save_online_state(x, y, replay_x, replay_y, seen, model_dir)
+    save_predictions(model, train_x, train_y, test_x, test_y, os.path.join(model_dir, 'predictions.npz'))
 
-    test_prob = model.predict(test_x)
-    test_pred = np.argmax(test_prob, axis=1).ravel().astype(int)
-    plot(test_y.astype(int), test_pred, test_prob, RESULTS_PLOT, 'results/Test')
+    if evaluate:
+        return evaluate_model(plots, os.path.join(model_dir, 'predictions.npz'))
 
 
 if __name__ == '__main__':
-    train()
+    if '--incremental' in sys.argv:
+        train_incremental()
+    else:
+        train(use_tf_data='--tf-data' in sys.argv)
+    render_telemetry()
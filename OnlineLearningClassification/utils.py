@@ -1,179 +1,340 @@
 import os
-import sys
-import traceback
+import queue
+import threading
+import weakref
 
-import pandas as pd
+import numpy as np
 import prettytable
-from PyQt5.QtCore import QAbstractTableModel, Qt, pyqtSlot, QObject, pyqtSignal, QRunnable
-from PyQt5.QtWidgets import QWidget, QVBoxLayout
-from matplotlib.backends.backend_qt import NavigationToolbar2QT
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
-from tensorflow.python.keras.callbacks import Callback
 
 from performance_evaluator.metrics import evaluate
-from performance_evaluator.plots import confusion_matrix, precision_recall_curve, roc_curve
 
 CLASSES = ['Not-Understand', 'Understand']
+ACC_LOSS_COLS = ['epoch', 'accuracy', 'val_accuracy', 'loss', 'val_loss']
+MONITOR_MODES = {
+    'val_loss': 'min',
+    'val_accuracy': 'max',
+    'val_kappa': 'max',
+}
+PLOT_MAX_RATE = 1.0
+LIVE_PLOTS = weakref.WeakKeyDictionary()
+TELEMETRY = queue.Queue()
+LOG_FLUSH_MS = 100
+LOG_MAX_BLOCKS = 5000
+PLOT_STYLE = 'seaborn-darkgrid'
+PLOT_FONT = 'JetBrains Mono'
+PLOT_FILES = {'CONF_MAT': 'conf_mat.png', 'PR_CURVE': 'pr_curve.png', 'ROC_CURVE': 'roc_curve.png'}
+RENDER_WORKERS = min(2 * len(PLOT_FILES) + 2, os.cpu_count() or 1)
+RENDER_POOL = {}
+RENDER_POOL_LOCK = threading.Lock()
+LAZY_ATTRS = {
+    'FigureCanvas': 'qt_utils',
+    'PandasDfToPyqtTable': 'qt_utils',
+    'WorkerSignals': 'qt_utils',
+    'Worker': 'qt_utils',
+    'TrainingCallback': 'callbacks',
+}
+
+
+def __getattr__(name):
+    if name in LAZY_ATTRS:
+        import importlib
+        return getattr(importlib.import_module(LAZY_ATTRS[name]), name)
+    raise AttributeError('module {0!r} has no attribute {1!r}'.format(__name__, name))
+
+
+def collapse_cr(text):
+    lines = text.split('\n')
+    for i, line in enumerate(lines):
+        if '\r' in line:
+            lines[i] = '\r' + line.rpartition('\r')[2]
+    return '\n'.join(lines)
+
+
+class BufferedStream:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buffer = []
 
+    def write(self, text):
+        with self._lock:
+            self._buffer.append(str(text))
 
-class FigureCanvas(QWidget):
-    def __init__(self, fig):
-        super(QWidget, self).__init__()
+    def flush(self):
+        pass
 
-        self.lt = QVBoxLayout()
-        self.fig = fig
-        self.fc = FigureCanvasQTAgg(fig)
-        self.lt.addWidget(self.fc)
-        self.tb = NavigationToolbar2QT(self.fc, self)
-        self.lt.addWidget(self.tb)
-        self.setLayout(self.lt)
+    def drain(self):
+        with self._lock:
+            text = ''.join(self._buffer)
+            self._buffer = []
+        return collapse_cr(text)
 
 
-class PandasDfToPyqtTable(QAbstractTableModel):
-    def __init__(self, df):
-        QAbstractTableModel.__init__(self)
-        self._df = df
+def print_df_to_table(df):
+    field_names = list(df.columns)
+    p_table = prettytable.PrettyTable(field_names=field_names)
+    p_table.add_rows(df.values.tolist())
+    print('\n'.join(['\t{0}'.format(p_) for p_ in p_table.get_string().splitlines(keepends=False)]))
 
-    def rowCount(self, parent=None):
-        return self._df.shape[0]
 
-    def columnCount(self, parent=None):
-        return self._df.shape[1]
+class TelemetryWriter(threading.Thread):
+    def __init__(self, acc_loss_path, plt1, plt2, rows):
+        super(TelemetryWriter, self).__init__(daemon=True)
+        self.acc_loss_path = acc_loss_path
+        self.plt1 = plt1
+        self.plt2 = plt2
+        self.reset = True
+        self.queue = queue.Queue()
+        self.publish(rows)
 
-    def data(self, index, role=Qt.DisplayRole):
-        if index.isValid():
-            if role == Qt.DisplayRole:
-                return str(self._df.iloc[index.row(), index.column()])
-        return None
+    def put(self, row):
+        self.queue.put(row)
 
-    def headerData(self, col, orientation, role=None):
-        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
-            return self._df.columns[col]
-        if orientation == Qt.Vertical and role == Qt.DisplayRole:
-            return col
-        return None
+    def close(self):
+        self.queue.put(None)
+        self.join()
 
+    def next_items(self):
+        items = [self.queue.get()]
+        while True:
+            try:
+                items.append(self.queue.get_nowait())
+            except queue.Empty:
+                return items
 
-class Stream(QObject):
-    fn = pyqtSignal(str)
+    def run(self):
+        stop = False
+        while not stop:
+            items = self.next_items()
+            stop = None in items
+            new = [r for r in items if r is not None]
+            if new:
+                with open(self.acc_loss_path, 'a') as f:
+                    f.writelines(','.join(str(v) for v in r) + '\n' for r in new)
+                self.publish(new)
+
+    def publish(self, rows):
+        if self.plt1 is None or self.plt2 is None or not (rows or self.reset):
+            return
+        snapshot = [list(r) for r in rows]
+        TELEMETRY.put((self.plt1, self.plt2, snapshot, self.reset, os.path.dirname(self.acc_loss_path)))
+        self.reset = False
+
+
+class LivePlot:
+    def __init__(self, fig, for_):
+        self.fig = fig
+        self.ax = fig.gca()
+        self.ax.clear()
+        self.lines = [
+            self.ax.plot([], [], label='Training', color='dodgerblue', animated=True)[0],
+            self.ax.plot([], [], label='Validation', color='orange', animated=True)[0],
+        ]
+        self.ax.set_title('Training and Validation {0}'.format(for_))
+        self.ax.set_xlabel('Epochs')
+        self.ax.set_ylabel(for_)
+        self.ax.legend()
+        self.background = None
+        self.canvas = None
+        self.cids = []
+        self.reset()
+
+    def attach(self):
+        if self.canvas is self.fig.canvas:
+            return
+        for cid in self.cids:
+            self.canvas.mpl_disconnect(cid)
+        self.canvas = self.fig.canvas
+        self.background = None
+        self.cids = [
+            self.canvas.mpl_connect('draw_event', self.on_draw),
+            self.canvas.mpl_connect('resize_event', self.on_resize),
+        ]
 
-    def write(self, text):
-        self.fn.emit(str(text))
+    def on_draw(self, event):
+        if self.canvas.is_saving():
+            return
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox) if self.canvas.supports_blit else None
+        self.draw_lines()
+
+    def on_resize(self, event):
+        self.background = None
+
+    def draw_lines(self):
+        for line in self.lines:
+            self.ax.draw_artist(line)
+
+    def reset(self):
+        self.data = np.zeros((3, 64))
+        self.count = 0
+        self.xmax = 0
+        self.ylim = None
+        self.background = None
+        for line in self.lines:
+            line.set_data([], [])
+
+    def extend(self, y1, y2):
+        n = len(y1)
+        if not n:
+            return
+        if self.count + n > self.data.shape[1]:
+            data = np.zeros((3, max(2 * self.data.shape[1], self.count + n)))
+            data[:, :self.count] = self.data[:, :self.count]
+            self.data = data
+        end = self.count + n
+        self.data[0, self.count:end] = np.arange(self.count, end)
+        self.data[1, self.count:end] = y1
+        self.data[2, self.count:end] = y2
+        self.count = end
+        for i, line in enumerate(self.lines):
+            line.set_data(self.data[0, :end], self.data[i + 1, :end])
+
+        self.attach()
+        relayout = self.background is None
+        if end > self.xmax:
+            self.xmax = max(2 * self.xmax, end, 10)
+            self.ax.set_xlim([0, self.xmax])
+            relayout = True
+        lo = min(np.min(y1), np.min(y2))
+        hi = max(np.max(y1), np.max(y2))
+        if self.ylim is None or lo < self.ylim[0] or hi > self.ylim[1]:
+            lo = min(lo, self.ylim[0]) if self.ylim else lo
+            hi = max(hi, self.ylim[1]) if self.ylim else hi
+            pad = (hi - lo) * 0.25 or 0.05
+            self.ylim = (lo - pad, hi + pad)
+            self.ax.set_ylim(self.ylim)
+            relayout = True
+        if relayout:
+            self.redraw()
+        else:
+            self.blit()
 
-    def flush(self):
-        pass
+    def redraw(self):
+        self.fig.tight_layout()
+        self.canvas.draw_idle()
 
+    def blit(self):
+        self.canvas.restore_region(self.background)
+        self.draw_lines()
+        self.canvas.blit(self.ax.bbox)
 
-class WorkerSignals(QObject):
-    finished = pyqtSignal()
-    error = pyqtSignal(tuple)
-    result = pyqtSignal(object)
 
+def live_plot(fig, for_):
+    if fig not in LIVE_PLOTS:
+        LIVE_PLOTS[fig] = LivePlot(fig, for_)
+    return LIVE_PLOTS[fig]
 
-class Worker(QRunnable):
-    def __init__(self, fn, *args, **kwargs):
-        super(Worker, self).__init__()
-        self.fn = fn
-        self.args = args
-        self.kwargs = kwargs
-        self.signals = WorkerSignals()
 
-    @pyqtSlot()
-    def run(self):
+def update_acc_loss(rows, plt1, plt2, save_dir, reset=False):
+    plots = [live_plot(plt1, 'Accuracy'), live_plot(plt2, 'Loss')]
+    data = np.array(rows, dtype=float).reshape(-1, len(ACC_LOSS_COLS))
+    for p, (c1, c2), name in zip(plots, [(1, 2), (3, 4)], ['accuracy.png', 'loss.png']):
+        if reset:
+            p.reset()
+        p.extend(data[:, c1], data[:, c2])
+        p.fig.savefig(os.path.join(save_dir, name))
+
+
+def render_telemetry():
+    batches = {}
+    while True:
         try:
-            result = self.fn(*self.args, **self.kwargs)
-        except Exception as e:
-            print(e)
-            traceback.print_exc()
-            exc_type, value = sys.exc_info()[:2]
-            self.signals.error.emit((exc_type, value, traceback.format_exc()))
+            plt1, plt2, rows, reset, save_dir = TELEMETRY.get_nowait()
+        except queue.Empty:
+            break
+        if reset or (plt1, plt2) not in batches:
+            batches[(plt1, plt2)] = (rows, reset, save_dir)
         else:
-            self.signals.result.emit(result)
-        finally:
-            self.signals.finished.emit()
+            batches[(plt1, plt2)][0].extend(rows)
+    for (plt1, plt2), (rows, reset, save_dir) in batches.items():
+        update_acc_loss(rows, plt1, plt2, save_dir, reset)
+    return len(batches)
 
 
-def print_df_to_table(df):
-    field_names = list(df.columns)
-    p_table = prettytable.PrettyTable(field_names=field_names)
-    p_table.add_rows(df.values.tolist())
-    print('\n'.join(['\t{0}'.format(p_) for p_ in p_table.get_string().splitlines(keepends=False)]))
+def setup_matplotlib(backend):
+    import matplotlib
+    from matplotlib import pyplot as plt
 
+    matplotlib.use(backend)
+    matplotlib.style.use(PLOT_STYLE)
+    plt.rcParams['font.family'] = PLOT_FONT
 
-class TrainingCallback(Callback):
-    def __init__(self, acc_loss_path, plt1, plt2):
-        self.acc_loss_path = acc_loss_path
-        self.plt1 = plt1
-        self.plt2 = plt2
-        if os.path.isfile(self.acc_loss_path):
-            self.df = pd.read_csv(self.acc_loss_path)
-            plot_acc_loss(self.df, self.plt1, self.plt2, os.path.dirname(self.acc_loss_path))
-        else:
-            self.df = pd.DataFrame([], columns=['epoch', 'accuracy', 'val_accuracy', 'loss', 'val_loss'])
-            self.df.to_csv(self.acc_loss_path, index=False)
-        Callback.__init__(self)
-
-    def on_epoch_end(self, epoch, logs=None):
-        self.df.loc[len(self.df.index)] = [
-            int(epoch + 1), round(logs['accuracy'], 4), round(logs['val_accuracy'], 4),
-            round(logs['loss'], 4), round(logs['val_loss'], 4)
-        ]
-        self.df.to_csv(self.acc_loss_path, index=False)
-        print('[EPOCH :: {0}] -> Acc :: {1} | Val_Acc :: {2} | Loss :: {3} | Val_Loss :: {4}'.format(
-            epoch + 1, *[format(v, '.4f') for v in self.df.values[-1][1:]]
-        ))
-        plot_acc_loss(self.df, self.plt1, self.plt2, os.path.dirname(self.acc_loss_path))
-
-
-def plot_line(plt_, y1, y2, epochs, for_, save_path):
-    ax = plt_.gca()
-    ax.clear()
-    ax.plot(range(epochs), y1, label='Training', color='dodgerblue')
-    ax.plot(range(epochs), y2, label='Validation', color='orange')
-    ax.set_title('Training and Validation {0}'.format(for_))
-    ax.set_xlabel('Epochs')
-    ax.set_ylabel(for_)
-    ax.set_xlim([0, epochs])
-    ax.legend()
-    plt_.tight_layout()
-    plt_.savefig(save_path)
-
-
-def plot_acc_loss(df, plt1, plt2, save_dir):
-    epochs = len(df)
-    acc = df['accuracy'].values
-    val_acc = df['val_accuracy'].values
-    loss = df['loss'].values
-    val_loss = df['val_loss'].values
-    plot_line(plt1, acc, val_acc, epochs, 'Accuracy', os.path.join(save_dir, 'accuracy.png'))
-    plot_line(plt2, loss, val_loss, epochs, 'Loss', os.path.join(save_dir, 'loss.png'))
-
-
-def plot(y, pred, prob, plts, results_dir):
-    for_ = os.path.basename(results_dir)
-    print('[INFO] Evaluating {0} Data'.format(for_))
-    os.makedirs(results_dir, exist_ok=True)
 
-    m = evaluate(y, pred, prob, CLASSES)
+def evaluate_to_csv(y, pred, prob, results_dir, curves=None):
+    os.makedirs(results_dir, exist_ok=True)
+    m = evaluate(y, pred, prob, CLASSES, curves=curves)
     df = m.class_metrics
     df.loc[len(df.index)] = [
         'Average',
         *[str(round(v, 4)).ljust(6, '0') for v in df[list(df.columns)[1:]].astype(float).mean(axis=0).values.tolist()]
     ]
     df.to_csv(os.path.join(results_dir, 'metrics.csv'), index=False)
-    print_df_to_table(df)
+    return m
 
-    fig = plts[for_]['CONF_MAT']
-    ax = fig.gca()
-    confusion_matrix(y, pred, CLASSES, ax=ax)
-    fig.savefig(os.path.join(results_dir, 'conf_mat.png'))
 
-    fig = plts[for_]['PR_CURVE']
-    ax = fig.gca()
-    precision_recall_curve(y, prob, CLASSES, ax=ax, legend_ncol=1)
-    fig.savefig(os.path.join(results_dir, 'pr_curve.png'))
+def draw_chart(fig, chart, y, pred, prob, curves=None):
+    from performance_evaluator.plots import confusion_matrix, precision_recall_curve, roc_curve
 
-    fig = plts[for_]['ROC_CURVE']
     ax = fig.gca()
-    roc_curve(y, prob, CLASSES, ax=ax, legend_ncol=1)
-    fig.savefig(os.path.join(results_dir, 'roc_curve.png'))
+    if chart == 'CONF_MAT':
+        confusion_matrix(y, pred, CLASSES, ax=ax)
+    elif chart == 'PR_CURVE':
+        precision_recall_curve(y, prob, CLASSES, ax=ax, curves=curves, legend_ncol=1)
+    else:
+        roc_curve(y, prob, CLASSES, ax=ax, curves=curves, legend_ncol=1)
+
+
+def render_task(task, y, pred, prob, results_dir, curves=None):
+    if task == 'METRICS':
+        return evaluate_to_csv(y, pred, prob, results_dir, curves)
+    from matplotlib.figure import Figure
+
+    fig = Figure()
+    draw_chart(fig, task, y, pred, prob, curves)
+    path = os.path.join(results_dir, PLOT_FILES[task])
+    os.makedirs(results_dir, exist_ok=True)
+    fig.savefig(path)
+    return path
+
+
+def get_render_pool(workers=RENDER_WORKERS):
+    with RENDER_POOL_LOCK:
+        if workers not in RENDER_POOL:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            RENDER_POOL[workers] = ProcessPoolExecutor(max_workers=workers,
+                                                       mp_context=multiprocessing.get_context('spawn'),
+                                                       initializer=setup_matplotlib, initargs=('Agg',))
+        return RENDER_POOL[workers]
+
+
+def show_image(fig, path):
+    from matplotlib.image import imread
+
+    fig.clf()
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.imshow(imread(path))
+    ax.axis('off')
+    fig.canvas.draw_idle()
+
+
+def plot_splits(jobs, charts=True, workers=RENDER_WORKERS):
+    from performance_evaluator.curves import CurveCache
+
+    tasks = ['METRICS', *PLOT_FILES] if charts else ['METRICS']
+    keys = [(for_, task) for for_ in jobs for task in tasks]
+    curves = {for_: CurveCache(y, prob) for for_, (y, _, prob, _) in jobs.items()}
+    if workers > 1:
+        pool = get_render_pool(workers)
+        futures = {k: pool.submit(render_task, k[1], *jobs[k[0]], curves[k[0]]) for k in keys}
+        outputs = {k: f.result() for k, f in futures.items()}
+    else:
+        outputs = {k: render_task(k[1], *jobs[k[0]], curves[k[0]]) for k in keys}
+
+    results, images = {}, {}
+    for for_ in jobs:
+        print('[INFO] Evaluating {0} Data'.format(for_))
+        results[for_] = outputs[(for_, 'METRICS')]
+        print_df_to_table(results[for_].class_metrics)
+        images[for_] = {task: outputs[(for_, task)] for task in tasks[1:]}
+    return results, images